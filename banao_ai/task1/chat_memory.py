@@ -3,21 +3,73 @@ from collections import deque
 class ChatMemory:
     """
     Manages conversation history and builds a structured prompt for Flan-T5.
+
+    Without a tokenizer the history is a sliding window of `window_size` turns.
+    With a tokenizer it is limited by `max_tokens` instead: each turn is tokenized once
+    when it is added, the model input is assembled from those cached token IDs, and the
+    oldest turns are evicted until the prompt fits the budget.
     """
-    def __init__(self, window_size=3):
+    def __init__(self, window_size=3, tokenizer=None, max_tokens=512):
         self.history = deque(maxlen=window_size)
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self._turn_ids = deque()
+        self._history_tokens = 0
+
+        if tokenizer is not None:
+            self._context_ids = self._encode("context:")
+            self._eos_ids = [tokenizer.eos_token_id] if tokenizer.eos_token_id is not None else []
+
+    def _encode(self, text):
+        return self.tokenizer.encode(text, add_special_tokens=False)
+
+    @staticmethod
+    def _format_turn(user_q, bot_a):
+        return f'The user previously asked "{user_q}" and the bot replied "{bot_a}".'
+
+    def _evict_oldest(self):
+        self.history.popleft()
+        if self._turn_ids:
+            self._history_tokens -= len(self._turn_ids.popleft())
 
     def add_message(self, user_input, bot_response):
         """Adds a new user/bot to the history."""
+        if self.history.maxlen is not None and len(self.history) == self.history.maxlen:
+            self._evict_oldest()
         self.history.append((user_input, bot_response))
 
+        if self.tokenizer is not None:
+            turn_ids = self._encode(self._format_turn(user_input, bot_response))
+            self._turn_ids.append(turn_ids)
+            self._history_tokens += len(turn_ids)
+
     def build_prompt(self, current_question):
         """Builds a prompt with clear context and question labels."""
         if not self.history:
             return f"question: {current_question}"
 
-        context = ""
-        for user_q, bot_a in self.history:
-            context += f'The user previously asked "{user_q}" and the bot replied "{bot_a}". '
-        
-        return f"context: {context.strip()} question: {current_question}"
\ No newline at end of file
+        context = " ".join(self._format_turn(user_q, bot_a) for user_q, bot_a in self.history)
+        return f"context: {context} question: {current_question}"
+
+    def build_input_ids(self, current_question):
+        """
+        Token-ID version of `build_prompt` that fits within `max_tokens`.
+        Only the new question is tokenized; history comes from the per-turn cache.
+        """
+        if self.tokenizer is None:
+            raise ValueError("build_input_ids needs ChatMemory to be created with a tokenizer.")
+
+        question_ids = self._encode(f"question: {current_question}")
+        question_ids = question_ids[:max(self.max_tokens - len(self._eos_ids), 0)]
+        budget = self.max_tokens - len(question_ids) - len(self._eos_ids) - len(self._context_ids)
+
+        while self.history and self._history_tokens > budget:
+            self._evict_oldest()
+
+        if not self.history:
+            return question_ids + self._eos_ids
+
+        input_ids = list(self._context_ids)
+        for turn_ids in self._turn_ids:
+            input_ids.extend(turn_ids)
+        return input_ids + question_ids + self._eos_ids
@@ -0,0 +1,99 @@
+import time
+import threading
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+
+# Decoding settings shared by the CLI and the server; greedy decoding keeps answers cacheable
+GENERATE_KWARGS = {"max_length": 50}
+
+def _to_tensor(generator, input_ids):
+    return torch.tensor([input_ids], device=generator.model.device)
+
+def generate_from_ids(generator, input_ids, **generate_kwargs):
+    """
+    Runs the pipeline's model directly on pre-tokenized input IDs (e.g. from
+    ChatMemory.build_input_ids) and returns the decoded answer.
+    """
+    input_tensor = _to_tensor(generator, input_ids)
+    with torch.no_grad():
+        output_ids = generator.model.generate(input_ids=input_tensor, attention_mask=torch.ones_like(input_tensor), **generate_kwargs)
+    return generator.tokenizer.decode(output_ids[0], skip_special_tokens=True)
+
+def generate_batch_from_ids(generator, batch_input_ids, **generate_kwargs):
+    """
+    Batched `generate_from_ids`: pads several tokenized prompts into one tensor and runs a
+    single generate call for all of them. Returns the decoded answers in input order.
+    """
+    batch = generator.tokenizer.pad({"input_ids": batch_input_ids}, return_tensors="pt").to(generator.model.device)
+    with torch.no_grad():
+        output_ids = generator.model.generate(input_ids=batch["input_ids"], attention_mask=batch["attention_mask"], **generate_kwargs)
+    return generator.tokenizer.batch_decode(output_ids, skip_special_tokens=True)
+
+
+class _CancelCriteria(StoppingCriteria):
+    """Stops generation at the next decoding step once the event is set."""
+    def __init__(self, cancel_event):
+        self.cancel_event = cancel_event
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.cancel_event.is_set()
+
+
+class StreamingGeneration:
+    """
+    Runs `model.generate` on a worker thread and yields the decoded text as it is produced.
+    `cancel()` stops generation at the next token. Once iteration finishes, `stats` holds the
+    time to first token and the generation speed.
+    """
+    def __init__(self, generator, input_ids, **generate_kwargs):
+        self._model = generator.model
+        self._cancel_event = threading.Event()
+        self._streamer = TextIteratorStreamer(generator.tokenizer, skip_special_tokens=True)
+        input_tensor = _to_tensor(generator, input_ids)
+        self._generate_kwargs = dict(
+            generate_kwargs,
+            input_ids=input_tensor,
+            attention_mask=torch.ones_like(input_tensor),
+            streamer=self._streamer,
+            stopping_criteria=StoppingCriteriaList([_CancelCriteria(self._cancel_event)]),
+        )
+        self._output_ids = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.stats = {}
+
+    def _run(self):
+        try:
+            with torch.no_grad():
+                self._output_ids = self._model.generate(**self._generate_kwargs)
+        except Exception as e:
+            self._error = e
+            self._streamer.end() # unblock the consumer
+
+    def __iter__(self):
+        start = time.perf_counter()
+        first_token_time = None
+        self._thread.start()
+
+        for text in self._streamer:
+            if text and first_token_time is None:
+                first_token_time = time.perf_counter()
+            yield text
+
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+        elapsed = time.perf_counter() - start
+        # The first decoder position is the start token, not generated text
+        num_tokens = int(self._output_ids.shape[-1]) - 1 if self._output_ids is not None else 0
+        self.stats = {
+            "ttft_s": (first_token_time or start + elapsed) - start,
+            "tokens": num_tokens,
+            "tokens_per_s": num_tokens / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
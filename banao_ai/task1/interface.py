@@ -1,18 +1,48 @@
-from load_model import load_model
+import argparse
+from load_model import BackgroundModelLoader
 from chat_memory import ChatMemory
+from generation import GENERATE_KWARGS, generate_from_ids, StreamingGeneration
+from response_cache import ResponseCache
+
+def stream_response(generator, input_ids):
+    """
+    Prints the answer as it is generated. Ctrl+C cancels this answer only.
+    Returns the full response, or None if it was cancelled.
+    """
+    generation = StreamingGeneration(generator, input_ids, **GENERATE_KWARGS)
+    pieces = []
+    print("Bot: ", end="", flush=True)
+    try:
+        for text in generation:
+            pieces.append(text)
+            print(text, end="", flush=True)
+    except KeyboardInterrupt:
+        generation.cancel()
+        print("\n[generation cancelled]")
+        return None
+
+    stats = generation.stats
+    print(f"\n  [first token {stats['ttft_s']:.2f}s | {stats['tokens']} tokens | {stats['tokens_per_s']:.1f} tokens/s]")
+    return "".join(pieces).strip()
 
 def main():
     """
     The main orchestration loop for the chatbot application.
     """
-    print("Local Chatbot (type /exit to quit)\n")
-    
-    generator = load_model()
-    if generator is None:
-        return
+    parser = argparse.ArgumentParser(description="Local command-line chatbot.")
+    parser.add_argument("--no-stream", action="store_true", help="print each answer only once it is complete")
+    parser.add_argument("--quantize", action="store_true", help="use the int8 CPU model (cached to disk after the first conversion)")
+    parser.add_argument("--cache-file", default=None, help="persist the response cache to this JSON file")
+    parser.add_argument("--cache-size", type=int, default=1024, help="maximum number of cached responses")
+    args = parser.parse_args()
 
+    print("Local Chatbot (type /exit to quit)\n")
 
-    memory = ChatMemory(window_size=3)
+    # The model loads and warms up in the background while the prompt is already shown
+    loader = BackgroundModelLoader(quantize=args.quantize)
+    generator = None
+    memory = None
+    cache = ResponseCache(args.cache_size, args.cache_file, namespace=f"google/flan-t5-base{':int8' if args.quantize else ''}")
 
     while True:
         try:
@@ -26,21 +56,52 @@ def main():
             print("Exiting chatbot. Goodbye!")
             break
 
-        prompt = memory.build_prompt(user_input)
+        if generator is None:
+            if not loader.is_ready():
+                print("Waiting for the model to finish loading...")
+            generator = loader.get()
+            if generator is None:
+                return
+            stats = loader.stats
+            rss = f", peak RSS {stats['peak_rss_mb']:.0f} MB" if stats.get("peak_rss_mb") else ""
+            print(f"  [model loaded in {stats['load_s']:.1f}s, warm-up {stats['warmup_s']:.1f}s{rss}]")
+            if stats.get("warmup_error"):
+                print(f"  [warm-up failed: {stats['warmup_error']}]")
+            # History is limited by flan-t5's 512-token input instead of a fixed number of turns
+            memory = ChatMemory(window_size=None, tokenizer=generator.tokenizer, max_tokens=512)
+
+        input_ids = memory.build_input_ids(user_input)
+        cache_key = cache.make_key(input_ids, GENERATE_KWARGS) if ResponseCache.is_cacheable(GENERATE_KWARGS) else None
+        bot_response = cache.get(cache_key) if cache_key else None
 
         try:
-            outputs = generator(prompt, max_length=50, max_new_tokens=None)
-            bot_response = outputs[0]['generated_text'].strip()
-            
-            # A check for an empty response
-            if not bot_response:
-                bot_response = "I'm not sure how to respond to that."
-
-            print(f"Bot: {bot_response}")
+            if bot_response is not None:
+                print(f"Bot: {bot_response}\n  [cached]")
+            else:
+                if args.no_stream:
+                    bot_response = generate_from_ids(generator, input_ids, **GENERATE_KWARGS).strip()
+                else:
+                    bot_response = stream_response(generator, input_ids)
+                    if bot_response is None:
+                        continue
+
+                # A check for an empty response
+                if not bot_response:
+                    bot_response = "I'm not sure how to respond to that."
+
+                if args.no_stream:
+                    print(f"Bot: {bot_response}")
+                if cache_key:
+                    cache.put(cache_key, bot_response)
+
             memory.add_message(user_input, bot_response)
 
         except Exception as e:
             print(f"An error occurred during generation: {e}")
 
+    cache.save()
+    stats = cache.stats()
+    print(f"Response cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate)")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
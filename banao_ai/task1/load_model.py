@@ -1,16 +1,104 @@
-from transformers import pipeline
+import os
+import sys
+import time
+import threading
+import torch
+import transformers
+from transformers import pipeline, AutoModelForSeq2SeqLM, AutoTokenizer
 
-def load_model(model_name="google/flan-t5-base"):
+QUANTIZED_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model_cache")
+
+def _load_quantized_model(model_name, cache_dir):
+    """
+    Returns an int8 dynamically quantized copy of the model. The quantized model is saved
+    to `cache_dir` after the first conversion and loaded directly on later launches.
+    """
+    # Pickled modules are tied to the library versions that produced them
+    cache_name = f"{model_name.replace('/', '__')}.int8.torch{torch.__version__}.tf{transformers.__version__}.pt"
+    cache_path = os.path.join(cache_dir, cache_name)
+
+    if os.path.exists(cache_path):
+        model = torch.load(cache_path, weights_only=False)
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save(model, cache_path)
+    model.eval()
+    return model
+
+def load_model(model_name="google/flan-t5-base", quantize=False, cache_dir=QUANTIZED_CACHE_DIR, verbose=True):
     """
     Loads a pre-trained text2text-generation model from Hugging Face.
     'google/flan-t5-base' is chosen for its balance of size and factual accuracy.
+    With quantize=True the Linear layers run as int8 on CPU (see _load_quantized_model).
     """
-    print(f"Loading model '{model_name}'... This may take a moment.")
+    if verbose:
+        print(f"Loading model '{model_name}'{' (int8)' if quantize else ''}... This may take a moment.")
     try:
         # Use the pipeline designed for this type of model
-        generator = pipeline('text2text-generation', model=model_name)
-        print("Model loaded successfully!")
+        if quantize:
+            model = _load_quantized_model(model_name, cache_dir)
+            generator = pipeline('text2text-generation', model=model, tokenizer=AutoTokenizer.from_pretrained(model_name))
+        else:
+            generator = pipeline('text2text-generation', model=model_name)
+        if verbose:
+            print("Model loaded successfully!")
         return generator
     except Exception as e:
         print(f"Error loading model: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where `resource` is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class BackgroundModelLoader:
+    """
+    Loads and warms up the model on a background thread so the prompt can be shown right away.
+    `get()` blocks until the model is ready; `stats` then holds load / warm-up time and memory.
+    """
+    def __init__(self, **load_kwargs):
+        self.load_kwargs = dict(load_kwargs, verbose=False)
+        self.generator = None
+        self.stats = {}
+        self._ready = threading.Event()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        loaded = None
+        try:
+            self.generator = load_model(**self.load_kwargs)
+            loaded = time.perf_counter()
+            if self.generator is not None:
+                try:
+                    # The first generate call pays for lazy initialisation; do it before the user asks
+                    self.generator("question: hello", max_length=5)
+                except Exception as e:
+                    # A failed warm-up only means the first answer pays that cost instead
+                    self.stats["warmup_error"] = str(e)
+        finally:
+            # Always filled in, even when loading or warm-up failed, so callers can report it
+            finished = time.perf_counter()
+            loaded = loaded or finished
+            self.stats.update({
+                "load_s": loaded - self._start,
+                "warmup_s": finished - loaded,
+                "peak_rss_mb": peak_rss_mb(),
+            })
+            self._ready.set()
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def get(self, timeout=None):
+        self._ready.wait(timeout)
+        return self.generator
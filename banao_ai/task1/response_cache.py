@@ -0,0 +1,75 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    LRU cache of bot answers keyed on the exact model input (token IDs), the generation
+    parameters and a namespace naming the model, so a repeated prompt is answered without
+    running the model. Only deterministic decoding is cached: with do_sample=True the same
+    input is supposed to give different answers.
+    With a `path`, entries are loaded from and saved to a JSON file.
+    """
+    def __init__(self, max_size=1024, path=None, namespace=""):
+        self.max_size = max_size
+        self.path = path
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for key, value in json.load(f).items():
+                    self._entries[key] = value
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def is_cacheable(generate_kwargs):
+        return not generate_kwargs.get("do_sample", False)
+
+    def make_key(self, input_ids, generate_kwargs):
+        payload = json.dumps({"namespace": self.namespace, "input_ids": list(input_ids), "params": generate_kwargs}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
@@ -0,0 +1,231 @@
+"""
+Multi-session HTTP chat server sharing one loaded flan-t5 model.
+
+Every session keeps its own ChatMemory. Prompts from all sessions go into one queue and are
+gathered into dynamic batches (up to --max-batch-size prompts, or whatever arrived within
+--max-wait-ms of the first one), so each generate call serves several users at once.
+
+    python server.py --port 8000
+    curl -X POST localhost:8000/chat -d '{"session_id": "alice", "message": "What is the capital of France?"}'
+    curl localhost:8000/stats
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from load_model import load_model
+from chat_memory import ChatMemory
+from generation import GENERATE_KWARGS, generate_batch_from_ids
+from response_cache import ResponseCache
+
+class DynamicBatcher:
+    """
+    Collects tokenized prompts from many threads and runs them through the model in batches
+    on a single worker thread. `submit` returns a Future with the decoded answer.
+    """
+    def __init__(self, generator, max_batch_size=8, max_wait_ms=20, max_queue=256, **generate_kwargs):
+        self.generator = generator
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.generate_kwargs = generate_kwargs
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "batches": 0, "errors": 0, "generate_s": 0.0}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, input_ids):
+        """Queues a prompt; raises queue.Full when the server is saturated."""
+        future = Future()
+        self._queue.put_nowait((input_ids, future))
+        return future
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            start = time.perf_counter()
+            try:
+                responses = generate_batch_from_ids(self.generator, [input_ids for input_ids, _ in batch], **self.generate_kwargs)
+                for (_, future), response in zip(batch, responses):
+                    future.set_result(response.strip())
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                with self._stats_lock:
+                    self.stats["errors"] += len(batch)
+
+            with self._stats_lock:
+                self.stats["requests"] += len(batch)
+                self.stats["batches"] += 1
+                self.stats["generate_s"] += time.perf_counter() - start
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["avg_batch_size"] = stats["requests"] / stats["batches"] if stats["batches"] else 0.0
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+class ChatSession:
+    def __init__(self, tokenizer, max_tokens):
+        self.memory = ChatMemory(window_size=None, tokenizer=tokenizer, max_tokens=max_tokens)
+        # Turns of one session are answered in order; different sessions run concurrently
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+class ChatServer:
+    """
+    Session registry plus the shared batcher. Sessions idle for longer than `session_ttl_s`
+    are dropped, and beyond `max_sessions` the least recently used ones go first.
+    """
+    def __init__(self, generator, batcher, cache=None, max_tokens=512, request_timeout=60, max_sessions=1000, session_ttl_s=1800):
+        self.generator = generator
+        self.batcher = batcher
+        self.cache = cache
+        self.max_tokens = max_tokens
+        self.request_timeout = request_timeout
+        self.max_sessions = max_sessions
+        self.session_ttl_s = session_ttl_s
+        self.sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self.started = time.time()
+
+    def session(self, session_id):
+        now = time.monotonic()
+        with self._sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = ChatSession(self.generator.tokenizer, self.max_tokens)
+                self.sessions[session_id] = session
+            session.last_used = now
+            self.sessions.move_to_end(session_id)
+
+            # Oldest entries come first, so stop at the first one that is still live
+            while self.sessions:
+                oldest_id, oldest = next(iter(self.sessions.items()))
+                if len(self.sessions) <= self.max_sessions and now - oldest.last_used <= self.session_ttl_s:
+                    break
+                del self.sessions[oldest_id]
+            return session
+
+    def chat(self, session_id, message):
+        session = self.session(session_id)
+        with session.lock:
+            input_ids = session.memory.build_input_ids(message)
+            cache_key = None
+            response = None
+            if self.cache is not None and ResponseCache.is_cacheable(self.batcher.generate_kwargs):
+                cache_key = self.cache.make_key(input_ids, self.batcher.generate_kwargs)
+                response = self.cache.get(cache_key)
+
+            if response is None:
+                response = self.batcher.submit(input_ids).result(timeout=self.request_timeout)
+                if not response:
+                    response = "I'm not sure how to respond to that."
+                if cache_key:
+                    self.cache.put(cache_key, response)
+            session.memory.add_message(message, response)
+        return response
+
+def make_handler(chat_server):
+    class ChatRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                return self._send_json(404, {"error": "not found"})
+            stats = chat_server.batcher.snapshot()
+            stats["sessions"] = len(chat_server.sessions)
+            if chat_server.cache is not None:
+                stats["cache"] = chat_server.cache.stats()
+            stats["uptime_s"] = time.time() - chat_server.started
+            self._send_json(200, stats)
+
+        def do_POST(self):
+            if self.path != "/chat":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                message = request["message"]
+            except (ValueError, KeyError):
+                return self._send_json(400, {"error": "expected JSON with a 'message' field"})
+
+            session_id = request.get("session_id") or uuid.uuid4().hex
+            start = time.perf_counter()
+            try:
+                response = chat_server.chat(session_id, message)
+            except queue.Full:
+                return self._send_json(503, {"error": "server busy, try again"})
+            except Exception as e:
+                return self._send_json(500, {"error": str(e)})
+
+            self._send_json(200, {
+                "session_id": session_id,
+                "response": response,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+            })
+
+        def log_message(self, format, *args):
+            pass # keep the console quiet under load
+
+    return ChatRequestHandler
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=20)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--quantize", action="store_true", help="use the int8 CPU model")
+    parser.add_argument("--max-sessions", type=int, default=1000, help="least recently used sessions are dropped beyond this")
+    parser.add_argument("--session-ttl", type=float, default=1800, help="seconds of inactivity before a session is dropped")
+    parser.add_argument("--cache-size", type=int, default=4096, help="maximum number of cached responses (0 disables the cache)")
+    parser.add_argument("--cache-file", default=None, help="persist the response cache to this JSON file on shutdown")
+    args = parser.parse_args()
+
+    generator = load_model(quantize=args.quantize)
+    if generator is None:
+        return
+
+    batcher = DynamicBatcher(generator, args.max_batch_size, args.max_wait_ms, args.max_queue, **GENERATE_KWARGS)
+    cache = None
+    if args.cache_size > 0:
+        cache = ResponseCache(args.cache_size, args.cache_file, namespace=f"google/flan-t5-base{':int8' if args.quantize else ''}")
+    chat_server = ChatServer(generator, batcher, cache, max_sessions=args.max_sessions, session_ttl_s=args.session_ttl)
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(chat_server))
+    print(f"Chat server listening on http://{args.host}:{args.port} (POST /chat, GET /stats)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+        httpd.server_close()
+        if cache is not None:
+            cache.save()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Startup time and memory of the full-precision and int8 variants.
+Each variant is loaded in a fresh process so the numbers reflect a real launch.
+
+    python startup_benchmark.py
+"""
+import json
+import subprocess
+import sys
+
+CHILD = """
+import json, time
+from load_model import BackgroundModelLoader
+loader = BackgroundModelLoader(quantize={quantize})
+loader.get()
+print(json.dumps(loader.stats))
+"""
+
+def main():
+    report = {}
+    for name, quantize in (("fp32", False), ("int8", True)):
+        output = subprocess.check_output([sys.executable, "-c", CHILD.format(quantize=quantize)], text=True)
+        report[name] = json.loads(output.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
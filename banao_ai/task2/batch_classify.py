@@ -0,0 +1,213 @@
+"""
+Batch classification of reviews from a file or stdin.
+
+Rows are read as a stream and classified in chunks: the primary model runs on the whole
+chunk in batches, and only the rows below the confidence threshold are sent to the
+zero-shot fallback (also batched). Results are written as soon as each chunk is done.
+
+    python batch_classify.py reviews.csv --output results.jsonl
+    cat reviews.txt | python batch_classify.py - --format txt > results.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+from model_loader import SentimentModel
+from logger_setup import logger
+from prediction_cache import PredictionCache, CACHED_FIELDS
+from config import HUB_MODEL_ID, FALLBACK_MODEL, CONFIDENCE_THRESHOLD, PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "txt"
+
+
+def read_rows(stream, input_format, text_field):
+    """Yields (row, text) pairs; `row` is a dict of the original fields."""
+    if input_format == "csv":
+        for row in csv.DictReader(stream):
+            yield row, row[text_field]
+    elif input_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                row = json.loads(line)
+                yield row, row[text_field]
+    else:
+        for line in stream:
+            text = line.rstrip("\n")
+            if text.strip():
+                yield {text_field: text}, text
+
+
+def iter_chunks(rows, chunk_size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def classify_chunk(model, texts, confidence_threshold, batch_size=32, fallback_batch_size=8, cache=None, run_fallback=True):
+    """
+    Classifies a list of texts with the same decision rule and fallback prompt as ClassificationDAG:
+    the primary prediction is kept when its confidence reaches the threshold,
+    otherwise the fallback model decides.
+    With a PredictionCache only the texts it does not know go through the models
+    (duplicates within the chunk are classified once).
+
+    With run_fallback=False the fallback model is never used: low-confidence rows keep the
+    primary prediction with provisional=True and are not cached, so the caller can hand
+    them to a fallback model elsewhere (see server.py).
+    """
+    if cache is None:
+        return _classify_texts(model, texts, confidence_threshold, batch_size, fallback_batch_size, run_fallback)
+
+    results = [cache.get(text) for text in texts]
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(cache.make_key(texts[i]), []).append(i)
+        else:
+            result["provisional"] = False
+
+    if missing:
+        unique_texts = [texts[indices[0]] for indices in missing.values()]
+        fresh = _classify_texts(model, unique_texts, confidence_threshold, batch_size, fallback_batch_size, run_fallback)
+        for indices, result in zip(missing.values(), fresh):
+            for i in indices:
+                results[i] = dict(result)
+        cache.put_many(
+            (text, {key: result[key] for key in CACHED_FIELDS})
+            for text, result in zip(unique_texts, fresh) if not result["provisional"]
+        )
+    return results
+
+
+def make_result(primary, fallback=None, provisional=False):
+    """
+    One result row in the DAG's final-state fields: `confidence` is always the primary
+    model's, `fallback_confidence` is set when the fallback decided.
+    """
+    return {
+        "prediction": primary["prediction"],
+        "confidence": primary["confidence"],
+        "final_decision": fallback["prediction"] if fallback else primary["prediction"],
+        "fallback_invoked": fallback is not None,
+        "fallback_confidence": fallback["confidence"] if fallback else None,
+        "provisional": provisional,
+    }
+
+
+def _classify_texts(model, texts, confidence_threshold, batch_size, fallback_batch_size, run_fallback=True):
+    primary = model.predict_primary_batch(texts, batch_size=batch_size)
+    low_confidence = [i for i, result in enumerate(primary) if result["confidence"] < confidence_threshold]
+
+    fallback_by_index = {}
+    if low_confidence and run_fallback:
+        fallback = model.predict_fallback_batch([texts[i] for i in low_confidence], batch_size=fallback_batch_size)
+        fallback_by_index = dict(zip(low_confidence, fallback))
+
+    return [
+        make_result(result, fallback_by_index.get(i), provisional=i in low_confidence and i not in fallback_by_index)
+        for i, result in enumerate(primary)
+    ]
+
+
+class ResultWriter:
+    """Writes result rows as JSONL, or CSV when the output path ends in .csv."""
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv_writer = None
+
+    def write(self, row):
+        if self.output_format == "csv":
+            if self._csv_writer is None:
+                self._csv_writer = csv.DictWriter(self.stream, fieldnames=list(row), extrasaction="ignore")
+                self._csv_writer.writeheader()
+            self._csv_writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def flush(self):
+        self.stream.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify reviews in batches from CSV / JSONL / text lines.")
+    parser.add_argument("input", help="input file, or '-' for stdin")
+    parser.add_argument("--output", default="-", help="output file (.jsonl or .csv), '-' for stdout")
+    parser.add_argument("--format", choices=["csv", "jsonl", "txt"], default=None, help="input format (default: from the file extension, txt for stdin)")
+    parser.add_argument("--text-field", default="text", help="column / key holding the review text")
+    parser.add_argument("--chunk-size", type=int, default=256, help="rows classified and written per step")
+    parser.add_argument("--batch-size", type=int, default=32, help="primary model batch size")
+    parser.add_argument("--fallback-batch-size", type=int, default=8, help="zero-shot model batch size")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--cache-file", default=PREDICTION_CACHE_PATH, help="SQLite prediction cache shared with other runs")
+    parser.add_argument("--no-cache", action="store_true", help="classify every row even if it was seen before")
+    args = parser.parse_args()
+
+    load_dotenv()
+    if not os.getenv("HUGGING_FACE_HUB_TOKEN"):
+        logger.error(" Error: HUGGING_FACE_HUB_TOKEN not found.")
+        logger.error(" Please create a .env file and add your Hugging Face token.")
+        exit()
+
+    model = SentimentModel(model_hub_id=HUB_MODEL_ID, fallback_model_name=FALLBACK_MODEL)
+    cache = None
+    if not args.no_cache:
+        cache = PredictionCache(
+            args.cache_file,
+            max_size=PREDICTION_CACHE_SIZE,
+            namespace=f"{HUB_MODEL_ID}|{FALLBACK_MODEL}|{args.threshold}"
+        )
+
+    input_format = args.format or ("txt" if args.input == "-" else detect_format(args.input))
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    writer = ResultWriter(output_stream, "csv" if args.output.lower().endswith(".csv") else "jsonl")
+
+    total = 0
+    fallbacks = 0
+    start = time.perf_counter()
+    try:
+        for chunk in iter_chunks(read_rows(input_stream, input_format, args.text_field), args.chunk_size):
+            texts = [text for _, text in chunk]
+            results = classify_chunk(model, texts, args.threshold, args.batch_size, args.fallback_batch_size, cache)
+            for (row, _), result in zip(chunk, results):
+                writer.write({**row, **result})
+            writer.flush()
+
+            total += len(chunk)
+            fallbacks += sum(result["fallback_invoked"] for result in results)
+            elapsed = time.perf_counter() - start
+            print(f"\r{total} rows | {total / elapsed:.1f} rows/s | fallback rate {fallbacks / total:.1%}", end="", file=sys.stderr)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+        if cache is not None:
+            cache.close()
+
+    elapsed = time.perf_counter() - start
+    print(file=sys.stderr)
+    print(f"Classified {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} rows/s), "
+          f"fallback rate {fallbacks / total if total else 0:.1%}", file=sys.stderr)
+    if cache is not None:
+        print(f"Prediction cache hit rate: {cache.stats()['hit_rate']:.1%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+# --- Configuration shared by the CLI and the batch tools ---
+HUB_MODEL_ID = "myselfmankar/distilbert-base-sst2-lora" # custom fine-tuned model
+FALLBACK_MODEL = "facebook/bart-large-mnli"             # A popular zero-shot model
+CONFIDENCE_THRESHOLD = 0.90                             # Kept it high for easy testing of the fallback logic
+FALLBACK_WAIT_S = 30.0                                  # How long a request may wait for the fallback model to finish loading
+DAG_EXECUTOR = "graph"                                  # "graph" (LangGraph) or "direct" (same nodes, no graph runtime)
+PREDICTION_CACHE_PATH = "prediction_cache.sqlite3"      # Shared on-disk prediction cache
+PREDICTION_CACHE_SIZE = 10000                           # Entries kept in memory per process
@@ -0,0 +1,111 @@
+"""
+Parity check and per-call overhead of the two ClassificationDAG executors.
+
+Both executors run the same node functions; this script first checks that the direct
+executor returns exactly the compiled graph's final state for inputs on both branches
+(accept, zero-shot fallback, provisional fallback), then times them. By default the
+models are replaced by instant stubs, so the numbers are pure orchestration overhead.
+
+    python executor_benchmark.py
+    python executor_benchmark.py --real --calls 200   # real models, includes inference time
+"""
+import argparse
+import hashlib
+import json
+import time
+from graph_builder import ClassificationDAG
+
+SAMPLE_TEXTS = [
+    "It's a great movie",
+    "it a good movie",
+    "it's a good movie but i don't like the actress",
+    "The plot was thin and the acting was worse.",
+    "Not bad, not great either.",
+    "I would watch it again tomorrow.",
+    "meh",
+    "Two hours I will never get back.",
+]
+
+
+class StubSentimentModel:
+    """Instant stand-in for SentimentModel with deterministic, text-dependent outputs."""
+    def __init__(self, fallback_ready=True):
+        self.fallback_state = "ready" if fallback_ready else "loading"
+
+    @staticmethod
+    def _score(text):
+        return int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+    def predict_primary(self, text):
+        score = self._score(text)
+        return {"prediction": "Positive" if score >= 0.5 else "Negative", "confidence": 0.5 + abs(score - 0.5)}
+
+    def wait_for_fallback(self, timeout=None):
+        return self.fallback_state == "ready"
+
+    def predict_fallback(self, text):
+        score = self._score(text[::-1])
+        return {"prediction": "Positive" if score >= 0.5 else "Negative", "confidence": 0.5 + abs(score - 0.5) / 2}
+
+
+def _comparable(state):
+    return {key: value for key, value in state.items() if key != "timings"}
+
+
+def check_parity(dag, texts):
+    """Returns the inputs whose direct and graph results differ (timings excluded)."""
+    app = dag.build_graph()
+    mismatches = []
+    for text in texts:
+        graph_state = _comparable(app.invoke({"input_text": text}))
+        direct_state = _comparable(dag.invoke_direct(text))
+        if graph_state != direct_state:
+            mismatches.append({"input_text": text, "graph": graph_state, "direct": direct_state})
+    return mismatches
+
+
+def time_calls(invoke, texts, calls):
+    for text in texts:  # warm-up
+        invoke(text)
+    started = time.perf_counter()
+    for i in range(calls):
+        invoke(texts[i % len(texts)])
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--real", action="store_true", help="use the real models instead of stubs")
+    args = parser.parse_args()
+
+    if args.real:
+        from model_loader import SentimentModel
+        from config import HUB_MODEL_ID, FALLBACK_MODEL
+        models = {"real": SentimentModel(HUB_MODEL_ID, FALLBACK_MODEL, load_fallback="eager")}
+    else:
+        models = {"stub": StubSentimentModel(), "stub_provisional": StubSentimentModel(fallback_ready=False)}
+
+    report = {}
+    for name, model in models.items():
+        dag = ClassificationDAG(model, fallback_wait_s=0)
+        mismatches = check_parity(dag, SAMPLE_TEXTS)
+        if mismatches:
+            print(json.dumps(mismatches, indent=2))
+            raise SystemExit(f"{name}: direct executor does not match the compiled graph")
+
+        fallbacks = sum(dag.check_confidence(dag.run_inference({"input_text": text})) == "ask_user" for text in SAMPLE_TEXTS)
+        graph_us = time_calls(lambda text: dag.app.invoke({"input_text": text}), SAMPLE_TEXTS, args.calls)
+        direct_us = time_calls(dag.invoke_direct, SAMPLE_TEXTS, args.calls)
+        report[name] = {
+            "parity": "ok",
+            "fallback_inputs": f"{fallbacks}/{len(SAMPLE_TEXTS)}",
+            "graph_us_per_call": round(graph_us, 1),
+            "direct_us_per_call": round(direct_us, 1),
+            "saved_us_per_call": round(graph_us - direct_us, 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
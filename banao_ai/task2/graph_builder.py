@@ -1,7 +1,11 @@
+import time
 from typing import TypedDict, Optional
 from langgraph.graph import StateGraph, END
 from model_loader import SentimentModel
 from logger_setup import logger
+from metrics import LatencyMetrics
+from prediction_cache import CACHED_FIELDS
+from config import CONFIDENCE_THRESHOLD, FALLBACK_WAIT_S
 
 
 class GraphState(TypedDict):
@@ -10,14 +14,36 @@ class GraphState(TypedDict):
     confidence: Optional[float]
     final_decision: Optional[str]
     fallback_invoked: bool
+    provisional: bool
+    fallback_confidence: Optional[float]
+    timings: dict
 
 class ClassificationDAG:
     """
     Builds and compiles the self-healing LangGraph DAG.
+
+    If the fallback model is still loading when it is needed, the fallback node waits up to
+    `fallback_wait_s` seconds and then returns the primary prediction marked as provisional.
+
+    Nodes add their latency to the state's `timings` (ms) and log one DEBUG record each;
+    `classify` logs one INFO record per request and feeds `metrics`.
+
+    With a `cache` (a PredictionCache), `classify` answers repeated inputs from it and stores
+    every non-provisional result, including the fallback's.
+
+    executor="direct" makes `classify` call the same node functions in order without the
+    compiled graph (see `invoke_direct`); executor="graph" runs them through LangGraph.
     """
-    def __init__(self, model: SentimentModel):
+    def __init__(self, model: SentimentModel, confidence_threshold: float = CONFIDENCE_THRESHOLD, fallback_wait_s: float = FALLBACK_WAIT_S, cache=None, executor: str = "graph"):
+        if executor not in ("graph", "direct"):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.executor = executor
         self.model = model
-        self.confidence_threshold = 0.90 # Define the confidence threshold here. Kept it high for easy testing of the fallback logic.
+        self.confidence_threshold = confidence_threshold
+        self.fallback_wait_s = fallback_wait_s
+        self.cache = cache
+        self.metrics = LatencyMetrics()
+        self.app = None
 
 
     # ... (inside the SentimentModel class)
@@ -41,18 +67,20 @@ class ClassificationDAG:
         """ 
         Runs the primary model inference by calling the model's prediction method.
         """
-        logger.info("--- INFERENCE (Primary Model) ---")
         input_text = state['input_text']
-        
+
+        started = time.perf_counter()
         result = self.model.predict_primary(input_text)
-        print(f"  Prediction: '{result['prediction']}' | Confidence: {result['confidence']:.2%}")
-        logger.info(f"  Prediction: '{result['prediction']}' | Confidence: {result['confidence']:.2%}")
-        
+        inference_ms = (time.perf_counter() - started) * 1000
+        logger.debug("inference", extra={"fields": {"node": "inference", **result, "inference_ms": inference_ms}})
+
         # The result dictionary already has the keys we need for the state.
         return {
             "prediction": result['prediction'],
             "confidence": result['confidence'],
-            "fallback_invoked": False
+            "fallback_invoked": False,
+            "provisional": False,
+            "timings": {**state.get('timings', {}), "inference_ms": inference_ms}
         }
 
 
@@ -75,46 +103,48 @@ class ClassificationDAG:
 
     def run_fallback_with_zero_shot(self, state: GraphState) -> dict:
         """ Handles the fallback logic using a zero-shot model when the primary model's confidence is low."""
-        logger.info("\n--- FALLBACK (Zero-Shot Model) ---")
-        print("  Primary model confidence was low. Consulting backup model...")
-        logger.info("  Primary model confidence was low. Consulting backup model...")
         input_text = state['input_text']
 
-        candidate_labels = ["Positive", "Negative"]
-
-        # The zero-shot pipeline returns one dictionary.
-        # The results are already sorted by score.
-        result = self.model.fallback_classifier(input_text, candidate_labels=candidate_labels)
-
-        # The highest-scoring label is the first one in the 'labels' list.
-        final_decision = result['labels'][0]
-        confidence = result['scores'][0]
+        started = time.perf_counter()
+        if not self.model.wait_for_fallback(self.fallback_wait_s):
+            wait_ms = (time.perf_counter() - started) * 1000
+            logger.debug("fallback unavailable", extra={"fields": {"node": "fallback", "fallback_state": self.model.fallback_state, "fallback_wait_ms": wait_ms}})
+            return {
+                "final_decision": state['prediction'],
+                "fallback_invoked": False,
+                "provisional": True,
+                "timings": {**state.get('timings', {}), "fallback_wait_ms": wait_ms}
+            }
 
-        print(f" Backup Model Prediction: '{final_decision}' | Confidence: {confidence:.2%}")
-        logger.info(f" Backup Model Prediction: '{final_decision}' | Confidence: {confidence:.2%}")
+        # Same zero-shot prompt as the batch and server paths
+        result = self.model.predict_fallback(input_text)
+        final_decision = result['prediction']
+        confidence = result['confidence']
+        fallback_ms = (time.perf_counter() - started) * 1000
+        logger.debug("fallback", extra={"fields": {"node": "fallback", "prediction": final_decision, "confidence": confidence, "fallback_ms": fallback_ms}})
 
         return {
             "final_decision": final_decision,
-            "fallback_invoked": True
+            "fallback_invoked": True,
+            "fallback_confidence": confidence,
+            "timings": {**state.get('timings', {}), "fallback_ms": fallback_ms}
         }
 
     def set_final_decision(self, state: GraphState) -> dict:
         """ Sets the final decision based on the model's prediction and confidence."""
-        logger.info("\n--- ACCEPTING ---")
-        logger.info(" Confidence is high. Final decision matches model prediction.")
+        logger.debug("accept", extra={"fields": {"node": "accept", "prediction": state['prediction']}})
         final_decision = state['prediction']
         return {"final_decision": final_decision}
 
 
     def check_confidence(self, state: GraphState) -> str:
         """ Checks the confidence of the model's prediction and decides whether to ask the user or accept the prediction."""
-        logger.info("\n--- CONFIDENCE CHECK ---")
         if state['confidence'] < self.confidence_threshold:
-            logger.info(f" Confidence {state['confidence']:.2%} is below threshold. Triggering fallback.")
-            return "ask_user" # route_name to fall back
+            route = "ask_user" # route_name to fall back
         else:
-            logger.info(f" Confidence {state['confidence']:.2%} is high. Accepting prediction.")
-            return "accept_prediction"
+            route = "accept_prediction"
+        logger.debug("confidence check", extra={"fields": {"node": "check_confidence", "confidence": state['confidence'], "threshold": self.confidence_threshold, "route": route}})
+        return route
 
 
     def build_graph(self):
@@ -140,4 +170,56 @@ class ClassificationDAG:
         workflow.add_edge("accept", END)
 
         logger.info("LangGraph compiled.")
-        return workflow.compile()
\ No newline at end of file
+        self.app = workflow.compile()
+        return self.app
+
+    def invoke_direct(self, input_text: str) -> dict:
+        """
+        Same result as `build_graph().invoke({"input_text": input_text})`, but the nodes are
+        called directly: inference, then the confidence check picks fallback or accept.
+        Skips LangGraph's per-step channel updates and routing.
+        """
+        state = {"input_text": input_text}
+        state.update(self.run_inference(state))
+        if self.check_confidence(state) == "ask_user":
+            state.update(self.run_fallback_with_zero_shot(state))
+        else:
+            state.update(self.set_final_decision(state))
+        return state
+
+    def invoke(self, input_text: str) -> dict:
+        """Runs one input with the configured executor, without caching, metrics or logging."""
+        if self.executor == "direct":
+            return self.invoke_direct(input_text)
+        if self.app is None:
+            self.build_graph()
+        return self.app.invoke({"input_text": input_text})
+
+    def classify(self, input_text: str) -> dict:
+        """Runs one input through the DAG, records its timings and logs one structured record."""
+
+        started = time.perf_counter()
+        cached = self.cache.get(input_text) if self.cache is not None else None
+        if cached is not None:
+            final_state = {"input_text": input_text, **cached, "provisional": False}
+        else:
+            final_state = self.invoke(input_text)
+            if self.cache is not None and not final_state.get('provisional', False):
+                self.cache.put(input_text, {key: final_state.get(key) for key in CACHED_FIELDS})
+
+        timings = {**final_state.get('timings', {}), "total_ms": (time.perf_counter() - started) * 1000}
+        final_state['timings'] = timings
+
+        # Cache hits did not run the fallback, so they do not count towards the fallback rate
+        self.metrics.record(timings, final_state['fallback_invoked'] and cached is None, final_state.get('provisional', False))
+        logger.info("classified", extra={"fields": {
+            "input_chars": len(input_text),
+            "cache_hit": cached is not None,
+            "prediction": final_state['prediction'],
+            "confidence": final_state['confidence'],
+            "final_decision": final_state['final_decision'],
+            "fallback_invoked": final_state['fallback_invoked'],
+            "provisional": final_state.get('provisional', False),
+            **timings,
+        }})
+        return final_state
\ No newline at end of file
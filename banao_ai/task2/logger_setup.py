@@ -1,26 +1,58 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+from datetime import datetime, timezone
 
-def set_logger():
-    """Sets up a logger for the ClassificationDAG module."""
-    
+LOG_FILE = "log_file.log"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; structured values passed as extra={"fields": {...}} are merged in."""
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def set_logger(log_file=LOG_FILE, level=logging.INFO, console_level=logging.WARNING):
+    """
+    Sets up a logger for the ClassificationDAG module.
+
+    Callers only put records on an in-memory queue; a QueueListener thread formats them and
+    does the file / console I/O, so logging stays off the request path. The file gets JSON
+    lines, the console only warnings and errors in the plain format.
+    """
     logger = logging.getLogger("ClassificationDAG_Logger")
-    logger.setLevel(logging.INFO)
-    
-    log_format = logging.Formatter(
+    logger.setLevel(level)
+    logger.propagate = False
+
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(JsonFormatter())
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    file_handler = logging.FileHandler("log_file.log")
-    file_handler.setFormatter(log_format)
+    ))
 
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(log_format)
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
 
     return logger
 
 logger = set_logger()
-
@@ -2,24 +2,17 @@ import os
 from model_loader import SentimentModel
 from graph_builder import ClassificationDAG
 from logger_setup import logger
+from prediction_cache import PredictionCache
+from config import HUB_MODEL_ID, FALLBACK_MODEL, CONFIDENCE_THRESHOLD, DAG_EXECUTOR, PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE
 from dotenv import load_dotenv
 
 
-# to enable-disable logging shown in console
-import logging
-logging.disable(logging.CRITICAL)  # Disable all logging except critical errors
-# logging.disable(logging.NOTSET)    # Enable all logging if required later
-
 load_dotenv()
 if not os.getenv("HUGGING_FACE_HUB_TOKEN"):
     logger.error(" Error: HUGGING_FACE_HUB_TOKEN not found.")
     logger.error(" Please create a .env file and add your Hugging Face token.")
     exit()
 
-# --- Configuration ---
-HUB_MODEL_ID = "myselfmankar/distilbert-base-sst2-lora" # custom fine-tuned model
-FALLBACK_MODEL = "facebook/bart-large-mnli"             # A popular zero-shot model
-
 def run_cli():
     """
     The main Command-Line Interface loop for the application.
@@ -29,8 +22,14 @@ def run_cli():
         model_hub_id=HUB_MODEL_ID,
         fallback_model_name=FALLBACK_MODEL    
     )
-    dag_builder = ClassificationDAG(model=model)
-    app = dag_builder.build_graph()
+    # Everything that changes a prediction goes into the cache namespace
+    cache = PredictionCache(
+        PREDICTION_CACHE_PATH,
+        max_size=PREDICTION_CACHE_SIZE,
+        namespace=f"{HUB_MODEL_ID}|{FALLBACK_MODEL}|{CONFIDENCE_THRESHOLD}"
+    )
+    dag_builder = ClassificationDAG(model=model, cache=cache, executor=DAG_EXECUTOR)
+    dag_builder.build_graph()
 
     # Start the user interaction loop
     print("\n--- Self-Healing Classification CLI ---")
@@ -42,23 +41,25 @@ def run_cli():
         if user_input.lower() == 'quit':
             break
         
-        logger.info(f"User Input: '{user_input}'")
-        final_state = app.invoke({"input_text": user_input})
-        
-        # Log the final state of the DAG
-        logger.info("--- FINAL OUTPUT ---")
-        logger.info(f"Reviewed Text: '{final_state['input_text']}'")
-        logger.info(f"Final Label: {final_state['final_decision']}")
-        if final_state['fallback_invoked']:
-            logger.warning("Final decision was corrected via fallback mechanism.")
-
+        # The DAG logs one structured record per input with its timings
+        final_state = dag_builder.classify(user_input)
 
-        # Also print a clean version for the user
         print("\n" + "="*50)
         print("--- Final Output ---")
+        print(f"  Prediction: '{final_state['prediction']}' | Confidence: {final_state['confidence']:.2%}")
+        if final_state['fallback_invoked']:
+            print("  Primary model confidence was low. Decided by the backup model.")
         print(f"  Final Label: {final_state['final_decision']}")
+        if final_state.get('provisional'):
+            print("  (provisional - backup model still loading)")
         print("="*50)
 
+    print("\n--- Latency (ms) ---")
+    print(dag_builder.metrics.format_summary())
+    cache_stats = cache.stats()
+    print(f"Prediction cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    cache.close()
+
 
 if __name__ == "__main__":
     run_cli()
\ No newline at end of file
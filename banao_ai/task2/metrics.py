@@ -0,0 +1,64 @@
+import threading
+from collections import deque
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list, q in [0, 1]."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LatencyMetrics:
+    """
+    In-process latency and fallback counters for the classifier.
+
+    Each request records its per-stage timings in milliseconds (e.g. inference_ms,
+    fallback_ms, total_ms). The last `window` requests are kept for the percentiles;
+    the request and fallback counters cover the whole process lifetime.
+    """
+    def __init__(self, window=10000):
+        self._samples = {}
+        self._window = window
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.fallbacks = 0
+        self.provisional = 0
+
+    def record(self, timings: dict, fallback_invoked=False, provisional=False):
+        with self._lock:
+            self.requests += 1
+            self.fallbacks += int(bool(fallback_invoked))
+            self.provisional += int(bool(provisional))
+            for name, value in timings.items():
+                if name not in self._samples:
+                    self._samples[name] = deque(maxlen=self._window)
+                self._samples[name].append(value)
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            requests, fallbacks, provisional = self.requests, self.fallbacks, self.provisional
+
+        summary = {
+            "requests": requests,
+            "fallback_rate": fallbacks / requests if requests else 0.0,
+            "provisional_rate": provisional / requests if requests else 0.0,
+        }
+        for name, values in samples.items():
+            summary[name] = {
+                "count": len(values),
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "max": values[-1],
+            }
+        return summary
+
+    def format_summary(self) -> str:
+        summary = self.summary()
+        lines = [f"requests: {summary['requests']} | fallback rate: {summary['fallback_rate']:.1%} | provisional: {summary['provisional_rate']:.1%}"]
+        for name, stats in summary.items():
+            if isinstance(stats, dict):
+                lines.append(f"  {name:<14} p50 {stats['p50']:8.1f}  p95 {stats['p95']:8.1f}  max {stats['max']:8.1f}  (n={stats['count']})")
+        return "\n".join(lines)
@@ -1,18 +1,35 @@
+import threading
+import time
 from transformers import pipeline
 from logger_setup import logger
 
+# Zero-shot prompt shared by every fallback path (DAG node, batch mode, server, threshold sweep)
+FALLBACK_LABELS = ["Positive review", "Negative review"]
+FALLBACK_HYPOTHESIS_TEMPLATE = "The sentiment of this review is {}."
+
 
 class SentimentModel:
     """
     A class to encapsulate the primary and fallback sentiment analysis models.
+
+    The primary model is loaded in the constructor. The fallback zero-shot model is much
+    larger, so it is loaded according to `load_fallback`:
+      - "background": on a daemon thread started by the constructor (default)
+      - "lazy": on first use
+      - "eager": in the constructor, before it returns
+    `fallback_state` tells where the load is ("not_loaded", "loading", "ready", "failed").
     """
-    def __init__(self, model_hub_id: str, fallback_model_name: str):
+    def __init__(self, model_hub_id: str, fallback_model_name: str, load_fallback: str = "background"):
         """
         Initializes the model loader.
         Args:
             model_hub_id: The ID of your fine-tuned model on the Hub.
             fallback_model_name: The name of the zero-shot model to use as a backup.
+            load_fallback: When to load the fallback model: "background", "lazy" or "eager".
         """
+        if load_fallback not in ("background", "lazy", "eager"):
+            raise ValueError(f"Unknown load_fallback mode: {load_fallback}")
+
         # --- Load Primary Fine-Tuned Model ---
         try:
             logger.info(f"Loading primary model from '{model_hub_id}'...")
@@ -29,17 +46,60 @@ class SentimentModel:
             logger.error(f" Error details: {e}")
             exit()
 
-        # --- Load Fallback Zero-Shot Model ---
+        # --- Fallback Zero-Shot Model (loaded separately) ---
+        self.fallback_model_name = fallback_model_name
+        self.fallback_state = "not_loaded"
+        self.fallback_error = None
+        self._fallback_classifier = None
+        self._fallback_done = threading.Event()
+        self._fallback_lock = threading.Lock()
+
+        if load_fallback == "eager":
+            self._load_fallback()
+        elif load_fallback == "background":
+            self.start_fallback_loading()
+
+    def _load_fallback(self):
         try:
-            logger.info(f"Loading fallback zero-shot model '{fallback_model_name}'...")
-            self.fallback_classifier = pipeline(
+            logger.info(f"Loading fallback zero-shot model '{self.fallback_model_name}'...")
+            started = time.perf_counter()
+            self._fallback_classifier = pipeline(
                 "zero-shot-classification",
-                model=fallback_model_name
+                model=self.fallback_model_name
             )
-            logger.info(" Fallback model loaded successfully.")
+            self.fallback_state = "ready"
+            logger.info(f" Fallback model loaded successfully in {time.perf_counter() - started:.1f}s.")
         except Exception as e:
+            self.fallback_error = e
+            self.fallback_state = "failed"
             logger.error(f" Error loading fallback model. Error details: {e}")
-            exit()
+        finally:
+            self._fallback_done.set()
+
+    def start_fallback_loading(self):
+        """Starts loading the fallback model on a daemon thread, unless a load was already started."""
+        with self._fallback_lock:
+            if self.fallback_state != "not_loaded":
+                return
+            self.fallback_state = "loading"
+        threading.Thread(target=self._load_fallback, name="FallbackModelLoader", daemon=True).start()
+
+    @property
+    def fallback_ready(self) -> bool:
+        return self.fallback_state == "ready"
+
+    def wait_for_fallback(self, timeout: float = None) -> bool:
+        """Starts the load if needed and waits up to `timeout` seconds. Returns True once the model is usable."""
+        self.start_fallback_loading()
+        self._fallback_done.wait(timeout)
+        return self.fallback_ready
+
+    @property
+    def fallback_classifier(self):
+        """The zero-shot pipeline; blocks until it has loaded."""
+        if not self.wait_for_fallback():
+            raise RuntimeError(f"Fallback model '{self.fallback_model_name}' failed to load: {self.fallback_error}")
+        return self._fallback_classifier
 
     def predict_primary(self, text: str) -> dict:
         """Runs a prediction using the primary fine-tuned model."""
@@ -50,15 +110,25 @@ class SentimentModel:
             "confidence": top_prediction['score']
         }
 
+    def predict_primary_batch(self, texts: list, batch_size: int = 32) -> list:
+        """Runs the primary model over a list of texts; returns one predict_primary-style dict per text."""
+        if not texts:
+            return []
+        outputs = []
+        for results in self.primary_classifier(texts, batch_size=batch_size, truncation=True):
+            top_prediction = max(results, key=lambda x: x['score'])
+            outputs.append({
+                "prediction": self.label_map[top_prediction['label']],
+                "confidence": top_prediction['score']
+            })
+        return outputs
+
     def predict_fallback(self, text: str) -> dict:
         """Runs a prediction using the fallback zero-shot model."""
-        candidate_labels = ["Positive review", "Negative review"]
-        hypothesis_template = "The sentiment of this review is {}."
-        
         results = self.fallback_classifier(
             text,
-            candidate_labels=candidate_labels,
-            hypothesis_template=hypothesis_template
+            candidate_labels=FALLBACK_LABELS,
+            hypothesis_template=FALLBACK_HYPOTHESIS_TEMPLATE
         )
         
         # The top score corresponds to the final prediction
@@ -68,4 +138,21 @@ class SentimentModel:
         return {
             "prediction": prediction,
             "confidence": confidence
-        }
\ No newline at end of file
+        }
+
+    def predict_fallback_batch(self, texts: list, batch_size: int = 8) -> list:
+        """Runs the fallback zero-shot model over a list of texts; returns one predict_fallback-style dict per text."""
+        if not texts:
+            return []
+        outputs = []
+        for results in self.fallback_classifier(
+            texts,
+            candidate_labels=FALLBACK_LABELS,
+            hypothesis_template=FALLBACK_HYPOTHESIS_TEMPLATE,
+            batch_size=batch_size
+        ):
+            outputs.append({
+                "prediction": "Positive" if results['labels'][0] == "Positive review" else "Negative",
+                "confidence": results['scores'][0]
+            })
+        return outputs
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+# The one result schema stored by every caller (CLI DAG, batch mode, server workers):
+# `prediction` / `confidence` are the primary model's, `final_decision` is the cascade's
+# answer and `fallback_confidence` is set only when the zero-shot model decided.
+CACHED_FIELDS = ("prediction", "confidence", "final_decision", "fallback_invoked", "fallback_confidence")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for cache keys: NFKC and collapsed whitespace. Case is kept: the
+    primary model is uncased, but the cached entry also holds the fallback decision and
+    bart-large-mnli's tokenizer is cased, so "GREAT." and "great." may be decided differently.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class PredictionCache:
+    """
+    Prediction cache in front of the classifier: an in-memory LRU backed by SQLite.
+
+    Keys hash the normalized text together with `namespace`, which callers build from the
+    model IDs, the threshold and anything else that changes the result, so a config change
+    never serves stale predictions. Values are JSON dicts with the CACHED_FIELDS keys, so
+    the CLI, batch runs and server workers share entries.
+
+    The SQLite file can be shared by several worker processes: it runs in WAL mode, each
+    process opens its own connection, and a locked database is retried for up to 30s instead of failing.
+    With path=None the cache is memory only.
+    """
+    def __init__(self, path=None, max_size=10000, namespace=""):
+        self.path = path
+        self.max_size = max_size
+        self.namespace = namespace
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _db(self):
+        # Connections must not be shared with a forked child, so reopen per process
+        if self._connection is None or self._connection_pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS predictions (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+            self._connection_pid = os.getpid()
+        return self._connection
+
+    def make_key(self, text: str) -> str:
+        payload = f"{self.namespace}\x00{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, text: str):
+        """Returns the cached result dict for `text`, or None."""
+        key = self.make_key(text)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return dict(value)
+
+            if self.path is not None:
+                row = self._db().execute("SELECT value FROM predictions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return dict(value)
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, value: dict):
+        key = self.make_key(text)
+        with self._lock:
+            self._remember(key, dict(value))
+            if self.path is not None:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO predictions (key, value, created) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time())
+                )
+                db.commit()
+
+    def put_many(self, items):
+        """Stores (text, value) pairs in one SQLite transaction."""
+        rows = [(self.make_key(text), dict(value)) for text, value in items]
+        with self._lock:
+            for key, value in rows:
+                self._remember(key, value)
+            if self.path is not None and rows:
+                db = self._db()
+                now = time.time()
+                db.executemany(
+                    "INSERT OR REPLACE INTO predictions (key, value, created) VALUES (?, ?, ?)",
+                    [(key, json.dumps(value), now) for key, value in rows]
+                )
+                db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_size": len(self._entries),
+            }
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None and self._connection_pid == os.getpid():
+                self._connection.close()
+            self._connection = None
@@ -0,0 +1,439 @@
+"""
+HTTP sentiment classification service backed by a pool of worker processes.
+
+Each worker process loads the primary model only. The pool sends every text to the least
+loaded worker's queue, and workers gather micro-batches (up to --max-batch-size texts, or
+whatever arrived within --max-wait-ms of the first one). Low-confidence texts are handed to
+--max-fallback dedicated fallback processes, the only ones that load the large zero-shot
+model, through small bounded queues. When those are full the primary prediction is returned
+marked provisional instead of queueing behind the fallback. With more than --max-queue texts
+in flight the server answers 429. A worker or fallback process that dies is restarted and
+the requests it held fail instead of hanging.
+
+    python server.py --workers 4 --port 8001
+    curl -X POST localhost:8001/classify -d '{"text": "It was a great movie"}'
+    curl -X POST localhost:8001/classify -d '{"texts": ["great", "awful"]}'
+    curl localhost:8001/stats
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from metrics import LatencyMetrics
+from config import HUB_MODEL_ID, FALLBACK_MODEL, CONFIDENCE_THRESHOLD, PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE
+
+
+def _open_cache(options):
+    from prediction_cache import PredictionCache
+    if not options["cache_file"]:
+        return None
+    return PredictionCache(
+        options["cache_file"],
+        max_size=PREDICTION_CACHE_SIZE,
+        namespace=f"{HUB_MODEL_ID}|{FALLBACK_MODEL}|{options['threshold']}"
+    )
+
+
+def _next_batch(source, max_batch_size, max_wait_ms):
+    """Blocks for one item, then gathers more for up to max_wait_ms. Returns (batch, stopping)."""
+    item = source.get()
+    if item is None:
+        return [], True
+    batch = [item]
+    deadline = time.monotonic() + max_wait_ms / 1000
+    while len(batch) < max_batch_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            item = source.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+
+def _worker_main(worker_id, input_queue, result_queue, options):
+    """Worker process: loads the primary model, then classifies micro-batches until it gets None."""
+    import torch
+    torch.set_num_threads(options["num_threads"])
+    from model_loader import SentimentModel
+    from batch_classify import classify_chunk
+
+    # The zero-shot model lives in the fallback processes only
+    model = SentimentModel(model_hub_id=HUB_MODEL_ID, fallback_model_name=FALLBACK_MODEL, load_fallback="lazy")
+    cache = _open_cache(options)
+    result_queue.put(("ready", ("worker", worker_id), None))
+
+    stopping = False
+    while not stopping:
+        batch, stopping = _next_batch(input_queue, options["max_batch_size"], options["max_wait_ms"])
+        if not batch:
+            break
+        try:
+            # Low-confidence rows come back provisional; the pool routes them to a fallback process
+            results = classify_chunk(
+                model, [text for _, text in batch], options["threshold"],
+                batch_size=options["max_batch_size"], cache=cache, run_fallback=False
+            )
+            for (request_id, _), result in zip(batch, results):
+                result_queue.put(("result", request_id, dict(result, worker=worker_id, batch_size=len(batch))))
+        except Exception as e:
+            for request_id, _ in batch:
+                result_queue.put(("error", request_id, str(e)))
+
+    if cache is not None:
+        cache.close()
+
+
+def _fallback_main(fallback_id, input_queue, result_queue, options):
+    """Fallback process: loads the zero-shot model, then decides the rows the pool hands over."""
+    import torch
+    torch.set_num_threads(options["num_threads"])
+    from model_loader import SentimentModel
+    from batch_classify import make_result
+    from prediction_cache import CACHED_FIELDS
+
+    model = SentimentModel(model_hub_id=HUB_MODEL_ID, fallback_model_name=FALLBACK_MODEL, load_fallback="eager")
+    if not model.fallback_ready:
+        return
+    cache = _open_cache(options)
+    result_queue.put(("ready", ("fallback", fallback_id), None))
+
+    stopping = False
+    while not stopping:
+        batch, stopping = _next_batch(input_queue, options["max_batch_size"], options["max_wait_ms"])
+        if not batch:
+            break
+        try:
+            fallback = model.predict_fallback_batch([text for _, text, _ in batch])
+        except Exception:
+            # The primary prediction is still a usable (provisional) answer
+            for request_id, _, result in batch:
+                result_queue.put(("result", request_id, result))
+            continue
+        decided = [(text, dict(result, **make_result(result, decision))) for (_, text, result), decision in zip(batch, fallback)]
+        for (request_id, _, _), (_, result) in zip(batch, decided):
+            result_queue.put(("result", request_id, result))
+        if cache is not None:
+            cache.put_many((text, {key: result[key] for key in CACHED_FIELDS}) for text, result in decided)
+
+    if cache is not None:
+        cache.close()
+
+
+class WorkerPool:
+    """
+    Starts the worker and fallback processes and routes their results back to per-request Futures.
+    `submit_many` raises queue.Full when a request would take the texts in flight past `max_queue`.
+
+    Every process has its own input queue and the pool records which process holds each
+    request. Texts go to the least loaded worker; provisional worker results go to a fallback
+    process with room in its queue (about one micro-batch), otherwise they are answered as is.
+    Once the pool is up a watcher thread fails the requests of a process that died and starts
+    a replacement on a fresh queue, since a process killed inside `get()` leaves its queue's lock held.
+    """
+    def __init__(self, num_workers, max_batch_size=16, max_wait_ms=10, max_queue=512, max_fallback=1,
+                 threshold=CONFIDENCE_THRESHOLD, cache_file=PREDICTION_CACHE_PATH):
+        # spawn gives each worker a clean torch runtime instead of a forked copy of the parent's
+        self.context = multiprocessing.get_context("spawn")
+        self.num_workers = num_workers
+        self.num_fallback = max_fallback
+        self.max_queue = max_queue
+        self.max_batch_size = max_batch_size
+        self.result_queue = self.context.Queue()
+        self.options = {
+            "num_threads": max(1, (os.cpu_count() or 1) // (num_workers + max_fallback)),
+            "max_batch_size": max_batch_size,
+            "max_wait_ms": max_wait_ms,
+            "threshold": threshold,
+            "cache_file": cache_file,
+        }
+
+        self._pending = {}
+        self._owners = {} # request_id -> key of the process holding it
+        self._load = {} # process key -> requests it holds
+        self._lock = threading.Lock()
+        self._closing = False
+        self._ids = itertools.count()
+        self.restarts = 0
+        self.ready_workers = set()
+        self.all_ready = threading.Event()
+        self.metrics = LatencyMetrics()
+        self.batch_sizes = LatencyMetrics()
+        self.rejected = 0
+
+        self.input_queues = {}
+        self.processes = {}
+        for key in [("worker", worker_id) for worker_id in range(num_workers)] + [("fallback", fallback_id) for fallback_id in range(max_fallback)]:
+            self._start_process(key)
+
+        self._collector = threading.Thread(target=self._collect, name="WorkerPoolCollector", daemon=True)
+        self._collector.start()
+        self._watcher = threading.Thread(target=self._watch, name="WorkerPoolWatcher", daemon=True)
+        self._watcher.start()
+
+    @property
+    def workers(self):
+        return [process for (kind, _), process in self.processes.items() if kind == "worker"]
+
+    @property
+    def fallback_workers(self):
+        return [process for (kind, _), process in self.processes.items() if kind == "fallback"]
+
+    def _start_process(self, key):
+        kind, process_id = key
+        # Fallback queues are bounded so a busy fallback turns rows provisional instead of queueing them
+        input_queue = self.context.Queue(maxsize=self.max_batch_size if kind == "fallback" else 0)
+        target = _fallback_main if kind == "fallback" else _worker_main
+        process = self.context.Process(target=target, args=(process_id, input_queue, self.result_queue, self.options), daemon=True)
+        process.start()
+        self.input_queues[key] = input_queue
+        self.processes[key] = process
+        self._load[key] = 0
+
+    def _assign(self, request_id, key):
+        # Callers hold self._lock
+        previous = self._owners.get(request_id)
+        if previous is not None:
+            self._load[previous] -= 1
+        if key is None:
+            self._owners.pop(request_id, None)
+        else:
+            self._owners[request_id] = key
+            self._load[key] += 1
+
+    def _watch(self, interval=1.0):
+        # Startup failures are reported by main(); from then on dead processes are replaced
+        self.all_ready.wait()
+        while not self._closing:
+            time.sleep(interval)
+            for key, process in list(self.processes.items()):
+                if process.is_alive() or self._closing:
+                    continue
+                with self._lock:
+                    orphaned = [request_id for request_id, owner in self._owners.items() if owner == key]
+                    futures = [self._pending.pop(request_id) for request_id in orphaned]
+                    for request_id in orphaned:
+                        self._assign(request_id, None)
+                    self._start_process(key)
+                    self.restarts += 1
+                for future in futures:
+                    future.set_exception(RuntimeError(f"{key[0]} process {key[1]} exited with code {process.exitcode}"))
+                print(f"{key[0]} process {key[1]} exited with code {process.exitcode}; failed {len(orphaned)} requests, restarting it")
+
+    def cancel(self, futures):
+        """Forgets requests the caller stopped waiting for, so they no longer count against max_queue."""
+        with self._lock:
+            for future in futures:
+                if self._pending.pop(future.request_id, None) is not None:
+                    self._assign(future.request_id, None)
+
+    def submit_many(self, texts):
+        """
+        Queues all `texts` or none of them: raises queue.Full, with nothing left pending, when
+        the request would take the texts in flight past `max_queue`.
+        """
+        started = time.perf_counter()
+        futures = []
+        with self._lock:
+            if len(self._pending) + len(texts) > self.max_queue:
+                self.rejected += 1
+                raise queue.Full
+            # Skip workers that died since the watcher last looked; their replacement is on the way
+            worker_keys = [key for key, process in self.processes.items() if key[0] == "worker" and process.is_alive()]
+            worker_keys = worker_keys or [key for key in self.processes if key[0] == "worker"]
+            for text in texts:
+                request_id = next(self._ids)
+                future = Future()
+                future.started = started
+                future.request_id = request_id
+                future.text = text
+                self._pending[request_id] = future
+                key = min(worker_keys, key=self._load.__getitem__)
+                self._assign(request_id, key)
+                self.input_queues[key].put_nowait((request_id, text))
+                futures.append(future)
+        return futures
+
+    def _hand_to_fallback(self, request_id, future, result):
+        """Queues a provisional worker result on a fallback process with room. Returns False if none has."""
+        with self._lock:
+            if request_id not in self._pending:
+                return True # cancelled meanwhile
+            fallback_keys = [key for key, process in self.processes.items() if key[0] == "fallback" and process.is_alive()]
+            for key in sorted(fallback_keys, key=self._load.__getitem__):
+                try:
+                    self.input_queues[key].put_nowait((request_id, future.text, result))
+                except queue.Full:
+                    continue
+                self._assign(request_id, key)
+                return True
+        return False
+
+    def _collect(self):
+        while True:
+            kind, key, payload = self.result_queue.get()
+            if kind == "stop":
+                break
+            if kind == "ready":
+                self.ready_workers.add(key)
+                if len(self.ready_workers) == self.num_workers + self.num_fallback:
+                    self.all_ready.set()
+                continue
+
+            with self._lock:
+                future = self._pending.get(key)
+                owner = self._owners.get(key)
+            if future is None:
+                continue
+            if kind == "result" and payload["provisional"] and owner and owner[0] == "worker":
+                if self._hand_to_fallback(key, future, payload):
+                    continue
+
+            with self._lock:
+                if self._pending.pop(key, None) is None:
+                    continue
+                self._assign(key, None)
+            if kind == "error":
+                future.set_exception(RuntimeError(payload))
+                continue
+
+            latency_ms = (time.perf_counter() - future.started) * 1000
+            self.metrics.record({"total_ms": latency_ms}, payload["fallback_invoked"], payload["provisional"])
+            self.batch_sizes.record({"batch_size": payload["batch_size"]})
+            future.set_result(payload)
+
+    def snapshot(self):
+        with self._lock:
+            in_flight = len(self._pending)
+            rejected = self.rejected
+            restarts = self.restarts
+        return {
+            "workers": self.num_workers,
+            "fallback_workers": self.num_fallback,
+            "ready_workers": sum(kind == "worker" for kind, _ in self.ready_workers),
+            "ready_fallback_workers": sum(kind == "fallback" for kind, _ in self.ready_workers),
+            "in_flight": in_flight,
+            "rejected": rejected,
+            "restarts": restarts,
+            "latency": self.metrics.summary(),
+            "batch_size": self.batch_sizes.summary().get("batch_size"),
+        }
+
+    def close(self):
+        self._closing = True
+        for kind in ("worker", "fallback"):
+            keys = [key for key in self.processes if key[0] == kind]
+            for key in keys:
+                self.input_queues[key].put(None)
+            for key in keys:
+                self.processes[key].join(timeout=10)
+        self.result_queue.put(("stop", None, None))
+
+
+class ClassifyHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under concurrent load before
+    # the bounded queue gets a chance to answer 429
+    request_queue_size = 256
+
+
+def make_handler(pool, request_timeout=120, max_texts=256):
+    class ClassifyRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != "/stats":
+                return self._send_json(404, {"error": "not found"})
+            self._send_json(200, pool.snapshot())
+
+        def do_POST(self):
+            if self.path != "/classify":
+                return self._send_json(404, {"error": "not found"})
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                texts = request["texts"] if "texts" in request else [request["text"]]
+                if not all(isinstance(text, str) for text in texts) or not 0 < len(texts) <= max_texts:
+                    raise ValueError
+            except (ValueError, KeyError, TypeError):
+                return self._send_json(400, {"error": f"expected JSON with a 'text' string or a 'texts' list of 1-{max_texts} strings"})
+
+            start = time.perf_counter()
+            try:
+                futures = pool.submit_many(texts)
+            except queue.Full:
+                return self._send_json(429, {"error": "too many requests, try again"})
+            try:
+                results = [future.result(timeout=request_timeout) for future in futures]
+            except FutureTimeoutError:
+                pool.cancel(futures)
+                return self._send_json(504, {"error": f"no result within {request_timeout}s"})
+            except Exception as e:
+                pool.cancel(futures)
+                return self._send_json(500, {"error": str(e)})
+
+            latency_ms = (time.perf_counter() - start) * 1000
+            if "texts" in request:
+                return self._send_json(200, {"results": results, "latency_ms": latency_ms})
+            self._send_json(200, dict(results[0], latency_ms=latency_ms))
+
+        def log_message(self, format, *args):
+            pass # keep the console quiet under load
+
+    return ClassifyRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=10)
+    parser.add_argument("--max-queue", type=int, default=512, help="queued texts before requests are rejected with 429")
+    parser.add_argument("--max-fallback", type=int, default=1, help="dedicated processes that load and run the zero-shot model")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--cache-file", default=PREDICTION_CACHE_PATH, help="shared SQLite prediction cache ('' disables it)")
+    args = parser.parse_args()
+
+    # Workers inherit the environment, including the Hub token
+    load_dotenv()
+    if not os.getenv("HUGGING_FACE_HUB_TOKEN"):
+        print(" Error: HUGGING_FACE_HUB_TOKEN not found. Please create a .env file and add your Hugging Face token.")
+        return
+
+    pool = WorkerPool(args.workers, args.max_batch_size, args.max_wait_ms, args.max_queue, args.max_fallback, args.threshold, args.cache_file)
+    print(f"Starting {args.workers} workers and {args.max_fallback} fallback workers...")
+    while not pool.all_ready.wait(timeout=1):
+        if not all(worker.is_alive() for worker in pool.workers + pool.fallback_workers):
+            print("A worker exited while loading its model; see log_file.log.")
+            pool.close()
+            return
+
+    httpd = ClassifyHTTPServer((args.host, args.port), make_handler(pool))
+    print(f"Classification server listening on http://{args.host}:{args.port} (POST /classify, GET /stats)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+        httpd.server_close()
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
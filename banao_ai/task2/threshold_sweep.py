@@ -0,0 +1,193 @@
+"""
+Confidence-threshold sweep for the primary / fallback cascade.
+
+Both models are run once over a labeled dataset and their predictions are cached in a
+JSON scores file. Every threshold is then evaluated offline from those scores: accuracy of
+the cascade, share of rows sent to the fallback, and the projected per-row latency and
+throughput from the measured (batched) per-row cost of each model.
+
+    python threshold_sweep.py labeled.csv --text-field text --label-field label
+    python threshold_sweep.py labeled.jsonl --max-fallback-rate 0.1
+    python threshold_sweep.py labeled.csv --thresholds 0.6 0.7 0.8 0.9 --output sweep.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+from batch_classify import detect_format, read_rows
+from config import HUB_MODEL_ID, FALLBACK_MODEL, CONFIDENCE_THRESHOLD
+
+LABEL_ALIASES = {
+    "positive": "Positive", "pos": "Positive", "1": "Positive", "label_1": "Positive",
+    "negative": "Negative", "neg": "Negative", "0": "Negative", "label_0": "Negative",
+}
+
+
+def normalize_label(label):
+    try:
+        return LABEL_ALIASES[str(label).strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown label: {label!r} (expected positive/negative or 1/0)")
+
+
+def load_dataset(path, text_field, label_field):
+    input_format = detect_format(path)
+    with open(path, newline="", encoding="utf-8") as stream:
+        rows = list(read_rows(stream, input_format, text_field))
+    return [text for _, text in rows], [normalize_label(row[label_field]) for row, _ in rows]
+
+
+def texts_digest(texts):
+    """sha256 of the dataset texts, so edited rows invalidate cached scores even when the row count is unchanged."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def scores_signature(texts):
+    """Everything the cached scores depend on: both models, the zero-shot prompt and the texts."""
+    from model_loader import FALLBACK_LABELS, FALLBACK_HYPOTHESIS_TEMPLATE
+    return {
+        "primary_model": HUB_MODEL_ID,
+        "fallback_model": FALLBACK_MODEL,
+        "fallback_prompt": [FALLBACK_HYPOTHESIS_TEMPLATE, *FALLBACK_LABELS],
+        "rows": len(texts),
+        "texts_sha256": texts_digest(texts),
+    }
+
+
+def score_dataset(texts, batch_size=32, fallback_batch_size=8):
+    """Runs both models over every text once and times them."""
+    from model_loader import SentimentModel
+    model = SentimentModel(model_hub_id=HUB_MODEL_ID, fallback_model_name=FALLBACK_MODEL, load_fallback="eager")
+
+    started = time.perf_counter()
+    primary = model.predict_primary_batch(texts, batch_size=batch_size)
+    primary_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    fallback = model.predict_fallback_batch(texts, batch_size=fallback_batch_size)
+    fallback_s = time.perf_counter() - started
+
+    return {
+        **scores_signature(texts),
+        "primary_ms_per_row": primary_s * 1000 / max(len(texts), 1),
+        "fallback_ms_per_row": fallback_s * 1000 / max(len(texts), 1),
+        "primary": primary,
+        "fallback": fallback,
+    }
+
+
+def load_or_score(scores_file, texts, recompute=False, batch_size=32, fallback_batch_size=8):
+    """Reuses the cached scores when they were made by the same models and prompt for the same texts."""
+    if scores_file and os.path.exists(scores_file) and not recompute:
+        with open(scores_file, encoding="utf-8") as f:
+            scores = json.load(f)
+        signature = scores_signature(texts)
+        if all(scores.get(key) == value for key, value in signature.items()):
+            print(f"Using cached scores from {scores_file}", file=sys.stderr)
+            return scores
+        print(f"{scores_file} does not match the current models / dataset, rescoring", file=sys.stderr)
+
+    scores = score_dataset(texts, batch_size, fallback_batch_size)
+    if scores_file:
+        tmp_path = scores_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(scores, f)
+        os.replace(tmp_path, scores_file)
+    return scores
+
+
+def sweep(scores, labels, thresholds):
+    """One report row per threshold, computed from the cached predictions only."""
+    primary = scores["primary"]
+    fallback = scores["fallback"]
+    total = len(labels)
+
+    report = []
+    for threshold in thresholds:
+        correct = 0
+        fallbacks = 0
+        for label, primary_result, fallback_result in zip(labels, primary, fallback):
+            if primary_result["confidence"] < threshold:
+                fallbacks += 1
+                correct += fallback_result["prediction"] == label
+            else:
+                correct += primary_result["prediction"] == label
+
+        fallback_rate = fallbacks / total if total else 0.0
+        latency_ms = scores["primary_ms_per_row"] + fallback_rate * scores["fallback_ms_per_row"]
+        report.append({
+            "threshold": threshold,
+            "accuracy": correct / total if total else 0.0,
+            "fallback_rate": fallback_rate,
+            "projected_ms_per_row": latency_ms,
+            "projected_rows_per_s": 1000 / latency_ms if latency_ms else float("inf"),
+        })
+    return report
+
+
+def pick_threshold(report, max_fallback_rate=None):
+    """Best accuracy (ties: lower fallback rate) among thresholds within the fallback budget."""
+    candidates = [row for row in report if max_fallback_rate is None or row["fallback_rate"] <= max_fallback_rate]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda row: (row["accuracy"], -row["fallback_rate"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dataset", help="labeled CSV or JSONL file")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("--scores-file", default=None, help="where to cache the model scores (default: <dataset>.scores.json)")
+    parser.add_argument("--recompute", action="store_true", help="ignore cached scores and rerun both models")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=None, help="thresholds to evaluate (default: 0.50 to 0.99 in steps of 0.01)")
+    parser.add_argument("--max-fallback-rate", type=float, default=None, help="only recommend thresholds within this fallback budget")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--fallback-batch-size", type=int, default=8)
+    parser.add_argument("--output", default=None, help="also write the sweep to this CSV file")
+    args = parser.parse_args()
+
+    load_dotenv()
+    texts, labels = load_dataset(args.dataset, args.text_field, args.label_field)
+    scores_file = args.scores_file or args.dataset + ".scores.json"
+    scores = load_or_score(scores_file, texts, args.recompute, args.batch_size, args.fallback_batch_size)
+
+    thresholds = args.thresholds or [round(0.50 + 0.01 * i, 2) for i in range(50)]
+    report = sweep(scores, labels, thresholds)
+
+    primary_only = sweep(scores, labels, [0.0])[0]
+    fallback_only = sweep(scores, labels, [1.01])[0]
+    print(f"{len(labels)} rows | primary {scores['primary_ms_per_row']:.1f} ms/row, fallback {scores['fallback_ms_per_row']:.1f} ms/row")
+    print(f"primary only: accuracy {primary_only['accuracy']:.2%} | fallback only: accuracy {fallback_only['accuracy']:.2%}\n")
+
+    print(f"{'threshold':>9}  {'accuracy':>8}  {'fallback':>8}  {'ms/row':>8}  {'rows/s':>8}")
+    for row in report:
+        marker = "  <- current" if abs(row["threshold"] - CONFIDENCE_THRESHOLD) < 1e-9 else ""
+        print(f"{row['threshold']:>9.2f}  {row['accuracy']:>8.2%}  {row['fallback_rate']:>8.1%}  "
+              f"{row['projected_ms_per_row']:>8.1f}  {row['projected_rows_per_s']:>8.1f}{marker}")
+
+    best = pick_threshold(report, args.max_fallback_rate)
+    budget = f" with fallback rate <= {args.max_fallback_rate:.0%}" if args.max_fallback_rate is not None else ""
+    if best is None:
+        print(f"\nNo threshold stays within the fallback budget{budget}.")
+    else:
+        print(f"\nBest threshold{budget}: {best['threshold']:.2f} "
+              f"(accuracy {best['accuracy']:.2%}, fallback rate {best['fallback_rate']:.1%}, {best['projected_rows_per_s']:.1f} rows/s)")
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(report[0]))
+            writer.writeheader()
+            writer.writerows(report)
+
+
+if __name__ == "__main__":
+    main()
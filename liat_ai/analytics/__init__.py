@@ -0,0 +1 @@
+from .spatial import TrackAnalytics, GridIndex
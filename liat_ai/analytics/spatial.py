@@ -0,0 +1,152 @@
+import numpy as np
+from tracker import TrackStore
+from tracker.track_store import TRACK_CLASSES
+from utils import get_centers_of_bboxes, get_bbox_widths
+
+
+class TrackAnalytics:
+    """
+    Vectorized queries over a whole match.
+
+    Takes a `tracks` dict or a `TrackStore` and computes the frame index, center and width of
+    every box once. Queries then run as array operations over all frames at the same time,
+    instead of looping over the per-frame dicts with `get_center_of_bbox`.
+    """
+    def __init__(self, tracks):
+        self.store = tracks if isinstance(tracks, TrackStore) else TrackStore.from_tracks(tracks)
+        self.num_frames = self.store.num_frames
+        self.frames = np.repeat(np.arange(self.num_frames), np.diff(np.asarray(self.store.frame_offsets)))
+        self.track_ids = np.asarray(self.store.columns["track_id"])
+        self.classes = np.asarray(self.store.columns["cls"])
+
+        bboxes = self.store.bboxes()
+        self.centers = get_centers_of_bboxes(bboxes)
+        self.widths = get_bbox_widths(bboxes)
+
+    def class_rows(self, track_class):
+        return np.flatnonzero(self.classes == TRACK_CLASSES.index(track_class))
+
+    def per_frame_position(self, rows):
+        """(num_frames, 2) array with the center of `rows` in their frame, NaN where absent."""
+        positions = np.full((self.num_frames, 2), np.nan, dtype=np.float32)
+        positions[self.frames[rows]] = self.centers[rows]
+        return positions
+
+    def ball_positions(self):
+        return self.per_frame_position(self.class_rows("ball"))
+
+    def _distances_to(self, rows, positions):
+        offsets = self.centers[rows] - positions[self.frames[rows]]
+        return np.hypot(offsets[:, 0], offsets[:, 1])
+
+    def nearest_to_ball(self, track_class="players"):
+        """
+        Nearest object of `track_class` to the ball in every frame that has both.
+        Returns (frames, track_ids, distances) arrays.
+        """
+        rows = self.class_rows(track_class)
+        distances = self._distances_to(rows, self.ball_positions())
+        valid = ~np.isnan(distances)
+        rows, distances = rows[valid], distances[valid]
+
+        order = np.lexsort((distances, self.frames[rows]))
+        _, first = np.unique(self.frames[rows][order], return_index=True)
+        best = order[first]
+        return self.frames[rows][best], self.track_ids[rows][best], distances[best]
+
+    def possession(self, max_distance, track_class="players"):
+        """Per-frame track_id of the object nearest the ball within `max_distance` px, -1 if none."""
+        owner = np.full(self.num_frames, -1, dtype=np.int64)
+        frames, track_ids, distances = self.nearest_to_ball(track_class)
+        close = distances <= max_distance
+        owner[frames[close]] = track_ids[close]
+        return owner
+
+    def possession_counts(self, max_distance, track_class="players"):
+        """Frames in possession per track_id."""
+        owner = self.possession(max_distance, track_class)
+        track_ids, counts = np.unique(owner[owner >= 0], return_counts=True)
+        return dict(zip(track_ids.tolist(), counts.tolist()))
+
+    def neighbors_within(self, track_id, radius, track_class="players", neighbor_class="players"):
+        """
+        Objects of `neighbor_class` within `radius` px of `track_id`, across all frames.
+        Returns (frames, track_ids, distances) arrays.
+        """
+        target = self.per_frame_position(np.intersect1d(self.class_rows(track_class), np.flatnonzero(self.track_ids == track_id)))
+        rows = self.class_rows(neighbor_class)
+        if neighbor_class == track_class:
+            rows = rows[self.track_ids[rows] != track_id]
+
+        distances = self._distances_to(rows, target)
+        close = distances <= radius
+        return self.frames[rows][close], self.track_ids[rows][close], distances[close]
+
+    def grid_index(self, cell_size, track_class="players"):
+        return GridIndex(self, self.class_rows(track_class), cell_size)
+
+    def pairs_within(self, radius, track_class="players"):
+        """
+        Every pair of `track_class` objects within `radius` px of each other, in every frame.
+        Returns (frames, track_ids_a, track_ids_b, distances) arrays.
+        """
+        return self.grid_index(radius, track_class).pairs_within(radius)
+
+
+class GridIndex:
+    """
+    Uniform grid spatial index over the box centers of a whole match.
+
+    Each point is keyed by (frame, cell_y, cell_x) in one sorted int64 array. Radius queries
+    with radius <= cell_size only have to look at the 3x3 cells around each point, and those
+    lookups are done for all points at once with `searchsorted`.
+    """
+    def __init__(self, analytics, rows, cell_size):
+        self.analytics = analytics
+        self.cell_size = cell_size
+
+        # +1 keeps the left / top neighbour cell of column / row 0 inside the key space
+        cells = np.clip(np.floor(analytics.centers[rows] / cell_size), 0, None).astype(np.int64) + 1
+        self.nx = int(cells[:, 0].max()) + 2 if len(rows) else 1
+        self.ny = int(cells[:, 1].max()) + 2 if len(rows) else 1
+
+        keys = self._keys(analytics.frames[rows], cells[:, 0], cells[:, 1])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.rows = rows[order]
+        self.cells = cells[order]
+
+    def _keys(self, frames, cell_x, cell_y):
+        return (frames.astype(np.int64) * self.ny + cell_y) * self.nx + cell_x
+
+    def candidate_pairs(self):
+        """Row pairs in the same or adjacent cells of the same frame, each pair once."""
+        frames = self.analytics.frames[self.rows]
+        points = np.arange(len(self.rows))
+        firsts, seconds = [], []
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                target = self._keys(frames, self.cells[:, 0] + dx, self.cells[:, 1] + dy)
+                low = np.searchsorted(self.keys, target, side="left")
+                counts = np.searchsorted(self.keys, target, side="right") - low
+
+                # Expand every point's [low, low + count) range into explicit pairs
+                first = np.repeat(points, counts)
+                second = np.repeat(low, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                keep = first < second
+                firsts.append(first[keep])
+                seconds.append(second[keep])
+
+        return self.rows[np.concatenate(firsts)], self.rows[np.concatenate(seconds)]
+
+    def pairs_within(self, radius):
+        if radius > self.cell_size:
+            raise ValueError("radius must not exceed the grid cell size")
+        analytics = self.analytics
+        rows_a, rows_b = self.candidate_pairs()
+        offsets = analytics.centers[rows_a] - analytics.centers[rows_b]
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        close = distances <= radius
+        rows_a, rows_b = rows_a[close], rows_b[close]
+        return analytics.frames[rows_a], analytics.track_ids[rows_a], analytics.track_ids[rows_b], distances[close]
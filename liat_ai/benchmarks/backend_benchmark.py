@@ -0,0 +1,95 @@
+"""
+Compares the PyTorch detector with its exported ONNX (and optionally INT8 ONNX) version:
+fps on CPU and detection agreement with the PyTorch output (per-class IoU matching).
+
+Run from the liat_ai directory:
+    python -m benchmarks.backend_benchmark --model your_model_path.pt --video input_video/15sec_input_720p.mp4 --int8
+"""
+import argparse
+import json
+import time
+import numpy as np
+from tracker import Tracker
+from utils import iter_video_frames, box_iou_matrix, match_boxes_greedy
+
+
+def detect(tracker, frames):
+    """Runs plain detection (no tracking) and returns per-frame (xyxy, cls, conf) plus fps."""
+    tracker.model.predict(frames[0], device="cpu", verbose=False) # warm-up
+    detections = []
+    start = time.perf_counter()
+    for frame in frames:
+        boxes = tracker.model.predict(frame, device="cpu", verbose=False)[0].boxes.cpu().numpy()
+        detections.append((boxes.xyxy, boxes.cls.astype(np.int64), boxes.conf))
+    elapsed = time.perf_counter() - start
+    return detections, len(frames) / elapsed
+
+
+def _scores(matched, matched_iou, reference_count, candidate_count):
+    return {
+        "precision": matched / candidate_count if candidate_count else 1.0,
+        "recall": matched / reference_count if reference_count else 1.0,
+        "mean_matched_iou": matched_iou / matched if matched else None,
+        "reference_boxes": reference_count,
+        "candidate_boxes": candidate_count,
+    }
+
+
+def agreement(reference, candidate, names=None, min_iou=0.5):
+    """
+    Precision / recall of `candidate` against `reference` detections, matched per class.
+    Returns the totals plus a "per_class" breakdown keyed by class name (from `names`), so a
+    regression on a rare class such as the ball is not hidden by the players.
+    """
+    counts = {} # class_id -> [matched, matched_iou, reference_count, candidate_count]
+
+    for (ref_xyxy, ref_cls, _), (cand_xyxy, cand_cls, _) in zip(reference, candidate):
+        for class_id in np.union1d(ref_cls, cand_cls).tolist():
+            ref_boxes = ref_xyxy[ref_cls == class_id]
+            cand_boxes = cand_xyxy[cand_cls == class_id]
+            iou = box_iou_matrix(ref_boxes, cand_boxes)
+            rows, cols = match_boxes_greedy(iou, min_iou)
+            ious = iou[rows, cols]
+            ious = ious[ious >= min_iou]
+
+            class_counts = counts.setdefault(class_id, [0, 0.0, 0, 0])
+            class_counts[0] += len(ious)
+            class_counts[1] += float(ious.sum())
+            class_counts[2] += len(ref_boxes)
+            class_counts[3] += len(cand_boxes)
+
+    totals = [sum(values) for values in zip(*counts.values())] or [0, 0.0, 0, 0]
+    report = _scores(*totals)
+    report["per_class"] = {
+        (names or {}).get(class_id, str(class_id)): _scores(*class_counts)
+        for class_id, class_counts in sorted(counts.items())
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True, help="PyTorch .pt weights")
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--int8", action="store_true", help="also benchmark the INT8-quantized ONNX model")
+    args = parser.parse_args()
+
+    frames = list(iter_video_frames(args.video, 0, args.frames))
+    variants = [("pytorch", dict(backend="pytorch")), ("onnx", dict(backend="onnx"))]
+    if args.int8:
+        variants.append(("onnx_int8", dict(backend="onnx", int8=True)))
+
+    report = {"frames": len(frames), "backends": {}}
+    reference = None
+    for name, kwargs in variants:
+        tracker = Tracker(args.model, **kwargs)
+        detections, fps = detect(tracker, frames)
+        reference = reference if reference is not None else detections
+        report["backends"][name] = {"fps": fps, **agreement(reference, detections, tracker.model.names)}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Per-stage and end-to-end benchmark of the tracking pipeline on a synthetic video.
+
+Stages: decode (read frames), inference (model.track), convert (Tracker.convert_result),
+draw (AnnotationRenderer), encode (cv2.VideoWriter) and end_to_end (streaming pipeline).
+Each stage runs in a fresh process so its peak RSS is its own. Without --model a stub
+detector replays the synthetic ground truth, so no weights are needed.
+
+Run from the liat_ai directory:
+    python -m benchmarks.pipeline_benchmark --frames 300 --width 1280 --height 720 --objects 25 --output bench.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+import cv2
+import numpy as np
+from benchmarks.synthetic import synthetic_background, synthetic_tracks
+from benchmarks.stub_detector import StubDetector
+from tracker import Tracker, AnnotationRenderer
+from utils import iter_video_frames, save_video_stream
+
+STAGES = ("decode", "inference", "convert", "draw", "encode", "end_to_end")
+
+
+def write_synthetic_video(path, config):
+    """Encodes the synthetic tracks as filled boxes on a pitch background."""
+    tracks = synthetic_tracks(config["frames"], config["width"], config["height"], config["objects"], config["seed"])
+    background = synthetic_background(config["width"], config["height"], config["seed"])
+
+    def frames():
+        for frame_num in range(config["frames"]):
+            frame = background.copy()
+            for name, color in (("players", (200, 200, 255)), ("referees", (0, 220, 220)), ("ball", (255, 255, 255))):
+                for obj in tracks[name][frame_num].values():
+                    x1, y1, x2, y2 = (int(v) for v in obj["bbox"])
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, cv2.FILLED)
+            yield frame
+
+    save_video_stream(frames(), path, fps=config["fps"])
+    return tracks
+
+
+def _make_tracker(config):
+    if config["model"]:
+        return Tracker(config["model"])
+    tracks = synthetic_tracks(config["frames"], config["width"], config["height"], config["objects"], config["seed"])
+    return Tracker(config["model"], model=StubDetector(tracks, config["stub_delay_ms"]))
+
+
+def _timed_iter(iterable, latencies):
+    """Yields items from `iterable`, recording the time spent producing each one."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        latencies.append(time.perf_counter() - start)
+        yield item
+
+
+def _run_stage(stage, config, video_path):
+    latencies = []
+
+    if stage == "decode":
+        for _ in _timed_iter(iter_video_frames(video_path), latencies):
+            pass
+
+    elif stage == "inference":
+        tracker = _make_tracker(config)
+        for frame in iter_video_frames(video_path):
+            start = time.perf_counter()
+            tracker.model.track(frame, tracker=config["tracker_config"], persist=True, verbose=False)
+            latencies.append(time.perf_counter() - start)
+
+    elif stage == "convert":
+        tracker = _make_tracker(config)
+        for frame in iter_video_frames(video_path):
+            result = tracker.model.track(frame, tracker=config["tracker_config"], persist=True, verbose=False)[0]
+            start = time.perf_counter()
+            tracker.convert_result(result)
+            latencies.append(time.perf_counter() - start)
+
+    elif stage == "draw":
+        tracks = synthetic_tracks(config["frames"], config["width"], config["height"], config["objects"], config["seed"])
+        background = synthetic_background(config["width"], config["height"], config["seed"])
+        renderer = AnnotationRenderer()
+        for frame_num in range(config["frames"]):
+            frame = background.copy()
+            start = time.perf_counter()
+            renderer.render_frame(frame, tracks["players"][frame_num], tracks["referees"][frame_num], tracks["ball"][frame_num])
+            latencies.append(time.perf_counter() - start)
+
+    elif stage == "encode":
+        background = synthetic_background(config["width"], config["height"], config["seed"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out = cv2.VideoWriter(os.path.join(tmp_dir, "encode.mp4"), cv2.VideoWriter_fourcc(*'mp4v'), config["fps"], (config["width"], config["height"]))
+            for _ in range(config["frames"]):
+                start = time.perf_counter()
+                out.write(background)
+                latencies.append(time.perf_counter() - start)
+            out.release()
+
+    elif stage == "end_to_end":
+        tracker = _make_tracker(config)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            annotated_frames = tracker.stream_annotated_frames(video_path, config["tracker_config"])
+            save_video_stream(_timed_iter(annotated_frames, latencies), os.path.join(tmp_dir, "end_to_end.mp4"), fps=config["fps"])
+
+    return latencies
+
+
+def _stage_worker(stage, config, video_path, result_queue):
+    start = time.perf_counter()
+    # Keep stdout clean for the JSON report
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            latencies = _run_stage(stage, config, video_path)
+    except Exception:
+        result_queue.put(("error", traceback.format_exc()))
+        return
+    wall_seconds = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+    result_queue.put(("ok", (latencies, wall_seconds, peak_rss_mb)))
+
+
+def _wait_for_stage(process, result_queue, poll_seconds=1.0):
+    """
+    Waits for the stage's result while the child is alive. Returns ("ok", result) or
+    ("error", message), including when the child died without reporting (e.g. a crash in native code).
+    """
+    while True:
+        try:
+            return result_queue.get(timeout=poll_seconds)
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # The child may have exited right after putting its result
+        try:
+            return result_queue.get(timeout=poll_seconds)
+        except queue.Empty:
+            return "error", f"stage process exited with code {process.exitcode} without a result"
+
+
+def summarize(latencies, wall_seconds, peak_rss_mb):
+    latencies_ms = np.asarray(latencies) * 1000
+    busy_seconds = float(np.sum(latencies))
+    return {
+        "frames": len(latencies),
+        "fps": len(latencies) / busy_seconds if busy_seconds else None,
+        "wall_seconds": wall_seconds,
+        "latency_ms": {
+            "mean": float(latencies_ms.mean()) if len(latencies_ms) else None,
+            **{f"p{q}": float(np.percentile(latencies_ms, q)) if len(latencies_ms) else None for q in (50, 90, 99)},
+        },
+        "peak_rss_mb": peak_rss_mb,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(config, stages=STAGES):
+    context = multiprocessing.get_context("spawn")
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "config": config,
+        },
+        "stages": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video_path = os.path.join(tmp_dir, "synthetic.mp4")
+        with contextlib.redirect_stdout(sys.stderr):
+            write_synthetic_video(video_path, config)
+
+        for stage in stages:
+            print(f"Benchmarking {stage}...", file=sys.stderr)
+            result_queue = context.Queue()
+            process = context.Process(target=_stage_worker, args=(stage, config, video_path, result_queue))
+            process.start()
+            status, result = _wait_for_stage(process, result_queue)
+            process.join()
+            if status == "ok":
+                report["stages"][stage] = summarize(*result)
+            else:
+                print(f"Stage {stage} failed:\n{result}", file=sys.stderr)
+                report["stages"][stage] = {"failed": True, "error": result}
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--objects", type=int, default=25)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=None, help="YOLO weights; the stub detector is used when omitted")
+    parser.add_argument("--stub-delay-ms", type=float, default=0.0, help="simulated inference time per frame for the stub")
+    parser.add_argument("--tracker-config", default="custom_botsort.yaml")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    config = {
+        "frames": args.frames,
+        "width": args.width,
+        "height": args.height,
+        "objects": args.objects,
+        "fps": args.fps,
+        "seed": args.seed,
+        "model": args.model,
+        "stub_delay_ms": args.stub_delay_ms,
+        "tracker_config": args.tracker_config,
+    }
+    report = run_benchmark(config, args.stages)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
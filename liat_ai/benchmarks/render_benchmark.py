@@ -0,0 +1,60 @@
+"""
+Per-frame drawing cost: per-object OpenCV calls (`Tracker.draw_frame_annotations`)
+vs. the cached-sprite, threaded `AnnotationRenderer`, plus a pixel diff between the two.
+
+Run from the liat_ai directory:
+    python -m benchmarks.render_benchmark --frames 300 --width 1920 --height 1080 --objects 25
+"""
+import argparse
+import json
+import time
+import numpy as np
+from tracker import Tracker, AnnotationRenderer
+from benchmarks.synthetic import synthetic_background, synthetic_tracks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--objects", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    background = synthetic_background(args.width, args.height)
+    tracks = synthetic_tracks(args.frames, args.width, args.height, args.objects)
+
+    # The drawing methods never touch the model, so skip loading weights
+    baseline = object.__new__(Tracker)
+    start = time.perf_counter()
+    reference = [
+        baseline.draw_frame_annotations(background.copy(), tracks["players"][i], tracks["referees"][i], tracks["ball"][i])
+        for i in range(args.frames)
+    ]
+    baseline_seconds = time.perf_counter() - start
+
+    renderer = AnnotationRenderer(num_workers=args.workers)
+    frames = [background.copy() for _ in range(args.frames)]
+    start = time.perf_counter()
+    rendered = renderer.render_frames(frames, tracks, in_place=True)
+    renderer_seconds = time.perf_counter() - start
+    renderer.close()
+
+    max_diff = max(int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max()) for a, b in zip(reference, rendered))
+    differing = sum(int((a != b).any(axis=2).sum()) for a, b in zip(reference, rendered))
+
+    print(json.dumps({
+        "frames": args.frames,
+        "resolution": [args.width, args.height],
+        "objects": args.objects,
+        "baseline_ms_per_frame": 1000 * baseline_seconds / args.frames,
+        "renderer_ms_per_frame": 1000 * renderer_seconds / args.frames,
+        "speedup": baseline_seconds / renderer_seconds if renderer_seconds else None,
+        "max_pixel_diff": max_diff,
+        "differing_pixels": differing,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
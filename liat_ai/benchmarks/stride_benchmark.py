@@ -0,0 +1,29 @@
+"""
+Throughput vs. accuracy drift of the adaptive detection stride.
+
+Run from the liat_ai directory:
+    python -m benchmarks.stride_benchmark --model your_model_path.pt --video input_video/15sec_input_720p.mp4
+"""
+import argparse
+import json
+from tracker import Tracker
+from tracker.motion import evaluate_strides
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--tracker-config", default="custom_botsort.yaml")
+    parser.add_argument("--strides", type=int, nargs="+", default=[2, 3, 5, 8])
+    parser.add_argument("--motion-threshold", type=float, default=None)
+    parser.add_argument("--method", choices=["optical_flow", "velocity"], default="optical_flow")
+    args = parser.parse_args()
+
+    tracker = Tracker(model_path=args.model)
+    report = evaluate_strides(tracker, args.video, args.tracker_config, args.strides, args.motion_threshold, args.method)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
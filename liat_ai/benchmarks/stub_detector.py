@@ -0,0 +1,83 @@
+"""Stand-in for the YOLO model so the pipeline can be benchmarked without weights."""
+import time
+import numpy as np
+from utils import iter_video_frames
+
+STUB_CLASS_NAMES = {0: "ball", 1: "goalkeeper", 2: "player", 3: "referee"}
+_CLASS_IDS = {"players": 2, "referees": 3, "ball": 0}
+_BALL_TRACK_ID = 999
+
+
+class StubBoxes:
+    """Minimal `ultralytics.engine.results.Boxes` look-alike over an (N, 7) array: xyxy, id, conf, cls."""
+    def __init__(self, data):
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def xyxy(self):
+        return self.data[:, :4]
+
+    @property
+    def id(self):
+        return self.data[:, 4]
+
+    @property
+    def conf(self):
+        return self.data[:, 5]
+
+    @property
+    def cls(self):
+        return self.data[:, 6]
+
+
+class StubResult:
+    def __init__(self, boxes, names, orig_img):
+        self.boxes = boxes
+        self.names = names
+        self.orig_img = orig_img
+
+
+class StubDetector:
+    """
+    Replays a synthetic `tracks` dict as tracked detections, one result per frame.
+    Pass it as `Tracker(model_path, model=StubDetector(tracks))`. `delay_ms` simulates
+    inference cost per frame.
+    """
+    def __init__(self, tracks, delay_ms=0.0):
+        self.names = STUB_CLASS_NAMES
+        self.predictor = None
+        self.delay_ms = delay_ms
+        self._frame_num = 0
+        self._frames = []
+
+        for frame_num in range(len(tracks["players"])):
+            rows = []
+            for name, class_id in _CLASS_IDS.items():
+                for track_id, obj in tracks[name][frame_num].items():
+                    track_id = _BALL_TRACK_ID if name == "ball" else track_id
+                    rows.append([*obj["bbox"], track_id, obj["confidence"], class_id])
+            self._frames.append(np.asarray(rows, dtype=np.float32).reshape(-1, 7))
+
+    def _result(self, frame_num, frame):
+        if self.delay_ms:
+            time.sleep(self.delay_ms / 1000)
+        data = self._frames[frame_num] if frame_num < len(self._frames) else np.zeros((0, 7), dtype=np.float32)
+        return StubResult(StubBoxes(data), self.names, frame)
+
+    def track(self, source, tracker=None, persist=False, stream=False, verbose=False, **kwargs):
+        if isinstance(source, str):
+            results = (self._result(frame_num, frame) for frame_num, frame in enumerate(iter_video_frames(source)))
+            return results if stream else list(results)
+
+        result = self._result(self._frame_num, source)
+        self._frame_num += 1
+        return [result]
@@ -0,0 +1,43 @@
+"""Synthetic frames and tracks so the benchmarks run offline, without videos or model weights."""
+import numpy as np
+
+
+def synthetic_background(width, height, seed=0):
+    """Pitch-green frame with a little noise so encoders have something to work with."""
+    rng = np.random.default_rng(seed)
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[:] = (40, 140, 50)
+    noise = rng.integers(-12, 13, size=(height, width, 1), dtype=np.int16)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+
+def synthetic_tracks(num_frames, width, height, num_objects=25, seed=0):
+    """
+    `tracks` dict of `num_objects` boxes moving with constant velocity and bouncing off the
+    frame edges. Every 12th object is a referee and one extra small box is the ball.
+    """
+    rng = np.random.default_rng(seed)
+    sizes = np.stack([rng.uniform(20, 40, num_objects), rng.uniform(50, 90, num_objects)], axis=1)
+    sizes = np.vstack([sizes, [[10, 10]]])
+    positions = rng.uniform([0, 0], [width, height], size=(num_objects + 1, 2)) - sizes / 2
+    velocities = rng.uniform(-4, 4, size=(num_objects + 1, 2))
+    velocities[-1] *= 3
+
+    tracks = {"players": [], "referees": [], "ball": []}
+    for _ in range(num_frames):
+        positions += velocities
+        low = positions < 0
+        high = positions + sizes > [width, height]
+        velocities[low | high] *= -1
+        positions = np.clip(positions, 0, [width, height] - sizes)
+
+        boxes = np.hstack([positions, positions + sizes]).tolist()
+        players, referees = {}, {}
+        for track_id, bbox in enumerate(boxes[:-1], start=1):
+            objects = referees if track_id % 12 == 0 else players
+            objects[track_id] = {"bbox": bbox, "confidence": 0.9}
+
+        tracks["players"].append(players)
+        tracks["referees"].append(referees)
+        tracks["ball"].append({1: {"bbox": boxes[-1], "confidence": 0.8}})
+    return tracks
@@ -1,4 +1,4 @@
-from utils import read_video, save_video
+from utils import read_video, save_video, save_video_stream, get_video_fps
 from tracker import Tracker
 import os
 
@@ -8,21 +8,34 @@ CUSTOM_MODEL_PATH = "your_model_path.pt"  # Replace with your actual model path
 VIDEO_PATH = "input_video/15sec_input_720p.mp4"  # Replace with your actual video path
 OUTPUT_PATH = "output_video/tracked_output.mp4"  # Path to save the output video
 TRACKER_CONFIG = "custom_botsort.yaml"
+STREAMING = True  # Single pass decode -> track -> annotate -> encode with constant memory
+SEGMENT_SECONDS = None  # e.g. 60 to roll the output over to a new file every minute
 
 def main():
-    # Optionally specify a stub_path to save/load tracking results
-    stub_path = os.path.join(base_path, 'tracker_stubs', 'player_reid_tracks.pkl')
-
     tracker = Tracker(model_path=CUSTOM_MODEL_PATH)
+
+    if STREAMING:
+        annotated_frames = tracker.stream_annotated_frames(VIDEO_PATH, TRACKER_CONFIG)
+        save_video_stream(annotated_frames, OUTPUT_PATH, fps=get_video_fps(VIDEO_PATH), segment_seconds=SEGMENT_SECONDS)
+        return
+
+    # Tracking results are cached per video/model/tracker config and checkpointed, so reruns
+    # load them directly and an interrupted run resumes from the last checkpoint
+    cache_dir = os.path.join(base_path, 'tracker_cache')
+
     tracks = tracker.get_object_tracks(
         video_path=VIDEO_PATH, 
         tracker_config=TRACKER_CONFIG, 
-        read_from_stub=False, 
-        stub_path=stub_path
+        cache_dir=cache_dir,
+        checkpoint_every=1000
     )
 
     video_frames = read_video(VIDEO_PATH)
 
-    output_video_frame = tracker.draw_tracks_on_frames(video_frames, tracks)
+    output_video_frame = tracker.draw_annotations(video_frames, tracks, in_place=True)
+
+    save_video(output_video_frames=output_video_frame, output_path=OUTPUT_PATH, fps=get_video_fps(VIDEO_PATH))
+
 
-    save_video(output_path=OUTPUT_PATH, frames=output_video_frame, fps=30)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import json
+import shutil
+import hashlib
+from .track_store import TrackStore
+
+CACHE_VERSION = 1
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _config_digest(tracker_config):
+    if not os.path.exists(tracker_config):
+        # Names like "botsort.yaml" resolve to the config shipped with ultralytics
+        try:
+            from ultralytics.utils.checks import check_yaml
+            tracker_config = str(check_yaml(tracker_config))
+        except Exception:
+            return hashlib.sha256(tracker_config.encode()).hexdigest()
+    return file_digest(tracker_config)
+
+
+def _model_digest(model_path, model=None):
+    if model_path is None:
+        # Injected models (e.g. the benchmark stub detector) have no weights file; key on their class
+        return f"injected:{type(model).__module__}.{type(model).__qualname__}"
+    return file_digest(model_path) if os.path.exists(model_path) else model_path
+
+
+def cache_key(video_path, model_path, tracker_config, model=None):
+    """
+    Hash of the video bytes, model weights and tracker config; any change gives a new key.
+    With model_path=None the key uses the class of the injected `model` instead of its weights.
+    """
+    digest = hashlib.sha256(f"track-cache-v{CACHE_VERSION}".encode())
+    digest.update(file_digest(video_path).encode())
+    digest.update(_model_digest(model_path, model).encode())
+    digest.update(_config_digest(tracker_config).encode())
+    return digest.hexdigest()
+
+
+class TrackCache:
+    """
+    Tracking results stored under `cache_dir/<cache_key>/`.
+
+    A finished run is a TrackStore in `tracks/`. While a run is in progress, every
+    checkpoint appends a TrackStore segment under `checkpoint/` and records it in
+    `progress.json`. A run that resumes after a crash is added as a new "run" that starts a
+    few frames before the last checkpoint; on completion the runs are stitched together the
+    same way parallel chunks are.
+    """
+    def __init__(self, cache_dir, key):
+        self.path = os.path.join(cache_dir, key)
+        self.tracks_path = os.path.join(self.path, "tracks")
+        self.checkpoint_path = os.path.join(self.path, "checkpoint")
+        self.progress_path = os.path.join(self.checkpoint_path, "progress.json")
+        self.progress = self._load_progress()
+
+    def _load_progress(self):
+        if not os.path.exists(self.progress_path):
+            return {"runs": []}
+        with open(self.progress_path) as f:
+            return json.load(f)
+
+    def _write_progress(self):
+        tmp_path = self.progress_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def load(self):
+        """The finished TrackStore, or None if this video/model/config was never fully tracked."""
+        return TrackStore.load(self.tracks_path) if TrackStore.exists(self.tracks_path) else None
+
+    def frames_done(self):
+        return max((run["end"] for run in self.progress["runs"]), default=0)
+
+    def start_run(self, start):
+        # Only persisted with its first segment, so a run that dies before checkpointing leaves no trace
+        self.progress["runs"] = [run for run in self.progress["runs"] if run["segments"]]
+        self.progress["runs"].append({"start": start, "end": start, "segments": []})
+
+    def save_segment(self, frames, first_frame):
+        run = self.progress["runs"][-1]
+        name = f"run{len(self.progress['runs']) - 1:03d}_seg{len(run['segments']):05d}"
+        TrackStore.from_frames(frames, first_frame).save(os.path.join(self.checkpoint_path, name))
+        run["segments"].append(name)
+        run["end"] = first_frame + len(frames)
+        self._write_progress()
+
+    def load_runs(self):
+        """Checkpointed runs as (start, frames) chunks, ready for `stitch_chunks`."""
+        runs = []
+        for run in self.progress["runs"]:
+            frames = []
+            for name in run["segments"]:
+                frames.extend(TrackStore.load(os.path.join(self.checkpoint_path, name)).iter_frames())
+            runs.append((run["start"], frames))
+        return runs
+
+    def finish(self, tracks):
+        tmp_path = self.tracks_path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        TrackStore.from_tracks(tracks).save(tmp_path)
+        shutil.rmtree(self.tracks_path, ignore_errors=True)
+        os.replace(tmp_path, self.tracks_path)
+        shutil.rmtree(self.checkpoint_path, ignore_errors=True)
+        self.progress = {"runs": []}
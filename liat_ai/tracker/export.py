@@ -0,0 +1,37 @@
+import os
+import shutil
+from .cache import file_digest
+
+BACKENDS = ("pytorch", "onnx")
+
+
+def export_cpu_model(model_path, int8=False, imgsz=640, cache_dir=None):
+    """
+    Exports a YOLO .pt checkpoint to ONNX for CPU inference and caches the result, by default
+    next to the weights. The file name carries a digest of the .pt, so retrained weights are
+    re-exported instead of silently reusing an old graph. With int8=True the ONNX graph is
+    additionally quantized to INT8 (dynamic post-training quantization via onnxruntime).
+    Returns the path of the model to load.
+    """
+    from ultralytics import YOLO
+
+    stem = os.path.splitext(os.path.basename(model_path))[0]
+    target_dir = cache_dir or os.path.dirname(os.path.abspath(model_path))
+    os.makedirs(target_dir, exist_ok=True)
+    prefix = os.path.join(target_dir, f"{stem}.{file_digest(model_path)[:12]}")
+
+    onnx_path = f"{prefix}.onnx"
+    if not os.path.exists(onnx_path):
+        print(f"Exporting {model_path} to ONNX...")
+        # dynamic=True keeps the batch axis free for multi-source and tiled inference
+        exported_path = YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+        shutil.move(str(exported_path), onnx_path)
+    if not int8:
+        return onnx_path
+
+    int8_path = f"{prefix}.int8.onnx"
+    if not os.path.exists(int8_path):
+        print(f"Quantizing {onnx_path} to INT8...")
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
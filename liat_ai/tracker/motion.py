@@ -0,0 +1,154 @@
+import warnings
+import cv2
+import numpy as np
+from utils import box_iou_matrix, match_boxes_greedy
+
+MOTION_THUMBNAIL_WIDTH = 160
+
+
+def motion_thumbnail(frame):
+    """Small grayscale copy of a frame for cheap motion / scene-change scoring."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    thumb_height = max(1, int(height * MOTION_THUMBNAIL_WIDTH / width))
+    return cv2.resize(gray, (MOTION_THUMBNAIL_WIDTH, thumb_height), interpolation=cv2.INTER_AREA)
+
+
+def motion_score(thumb_a, thumb_b):
+    """Mean absolute pixel difference in [0, 1]; fast pans and scene cuts push it up."""
+    return float(cv2.absdiff(thumb_a, thumb_b).mean()) / 255.0
+
+
+class MotionPropagator:
+    """
+    Moves the boxes of the last detector frame forward over frames the detector skips.
+
+    method="velocity" applies a constant-velocity step per track, estimated from its boxes
+    in the last two detector frames. method="optical_flow" follows a small grid of points
+    inside each box with sparse Lucas-Kanade flow (the same idea as BoT-SORT's
+    `gmc_method: sparseOptFlow`) and falls back to the velocity step for boxes it loses.
+    """
+    def __init__(self, method="optical_flow", grid_size=3):
+        if method not in ("velocity", "optical_flow"):
+            raise ValueError(f"Unknown motion method: {method}")
+        self.method = method
+        self.grid_size = grid_size
+
+        self.keys = []
+        self.confidences = []
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocity = np.zeros((0, 4), dtype=np.float32)
+        self.key_boxes = {}
+        self.key_frame = 0
+        self.frame_num = 0
+        self.prev_gray = None
+
+    def update(self, frame_dicts, gray, frame_num):
+        """Resets the state from the (players, referees, ball) dicts of a detector frame."""
+        keys, confidences, boxes = [], [], []
+        for class_index, objects in enumerate(frame_dicts):
+            for track_id, obj in objects.items():
+                keys.append((class_index, track_id))
+                confidences.append(obj["confidence"])
+                boxes.append(obj["bbox"])
+
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        gap = max(frame_num - self.key_frame, 1)
+        velocity = np.zeros_like(boxes)
+        for i, key in enumerate(keys):
+            previous_box = self.key_boxes.get(key)
+            if previous_box is not None:
+                velocity[i] = (boxes[i] - previous_box) / gap
+
+        self.keys = keys
+        self.confidences = confidences
+        self.boxes = boxes
+        self.velocity = velocity
+        self.key_boxes = dict(zip(keys, boxes))
+        self.key_frame = frame_num
+        self.frame_num = frame_num
+        self.prev_gray = gray
+
+    def _flow_shift(self, gray):
+        """Median optical-flow displacement per box, NaN where no grid point was tracked."""
+        fractions = np.linspace(0.25, 0.75, self.grid_size, dtype=np.float32)
+        fx, fy = np.meshgrid(fractions, fractions)
+        fx, fy = fx.ravel(), fy.ravel()
+
+        widths = self.boxes[:, 2] - self.boxes[:, 0]
+        heights = self.boxes[:, 3] - self.boxes[:, 1]
+        xs = self.boxes[:, None, 0] + fx[None, :] * widths[:, None]
+        ys = self.boxes[:, None, 1] + fy[None, :] * heights[:, None]
+        points = np.stack([xs, ys], axis=-1).reshape(-1, 1, 2).astype(np.float32)
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, winSize=(15, 15), maxLevel=2)
+        shifts = (next_points - points).reshape(len(self.boxes), -1, 2)
+        valid = status.reshape(len(self.boxes), -1).astype(bool)
+        shifts = np.where(valid[..., None], shifts, np.nan)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning) # all-NaN rows for lost boxes
+            return np.nanmedian(shifts, axis=1)
+
+    def propagate(self, gray, frame_num):
+        """Returns propagated (players, referees, ball) dicts for a frame the detector skipped."""
+        steps = frame_num - self.frame_num
+        if len(self.boxes):
+            if self.method == "optical_flow" and self.prev_gray is not None:
+                shift = self._flow_shift(gray)
+                step = np.concatenate([shift, shift], axis=1)
+                lost = np.isnan(step).any(axis=1)
+                step[lost] = self.velocity[lost] * steps
+                self.boxes = self.boxes + step
+            else:
+                self.boxes = self.boxes + self.velocity * steps
+
+        self.frame_num = frame_num
+        self.prev_gray = gray
+
+        frame_dicts = ({}, {}, {})
+        for (class_index, track_id), confidence, bbox in zip(self.keys, self.confidences, self.boxes.tolist()):
+            frame_dicts[class_index][track_id] = {"bbox": bbox, "confidence": confidence}
+        return frame_dicts
+
+
+def track_drift(reference_tracks, tracks, min_iou=0.5):
+    """
+    ID-agnostic agreement of `tracks` with a detector-on-every-frame reference run.
+    Boxes are matched greedily by IoU per frame and class. Returns the mean IoU over all
+    reference boxes (unmatched ones count as 0) and the recall at `min_iou`.
+    """
+    total_iou = 0.0
+    matched = 0
+    total = 0
+    for name in ("players", "referees", "ball"):
+        for reference_frame, frame in zip(reference_tracks[name], tracks[name]):
+            if not reference_frame:
+                continue
+            total += len(reference_frame)
+            if not frame:
+                continue
+            iou = box_iou_matrix([o["bbox"] for o in reference_frame.values()], [o["bbox"] for o in frame.values()])
+            rows, cols = match_boxes_greedy(iou)
+            ious = iou[rows, cols]
+            total_iou += float(ious.sum())
+            matched += int((ious >= min_iou).sum())
+
+    return {
+        "mean_iou": total_iou / total if total else 1.0,
+        "recall": matched / total if total else 1.0,
+    }
+
+
+def evaluate_strides(tracker, video_path, tracker_config, strides=(2, 3, 5, 8), motion_threshold=None, method="optical_flow"):
+    """
+    Runs the adaptive mode for each stride and reports throughput against drift from a
+    stride-1 reference run, so N can be chosen for the hardware at hand.
+    """
+    reference_tracks, reference_stats = tracker.get_object_tracks_adaptive(video_path, tracker_config, detect_every=1)
+    report = [dict(reference_stats, detect_every=1, mean_iou=1.0, recall=1.0)]
+
+    for stride in strides:
+        tracks, stats = tracker.get_object_tracks_adaptive(video_path, tracker_config, detect_every=stride, motion_threshold=motion_threshold, method=method)
+        report.append(dict(stats, detect_every=stride, **track_drift(reference_tracks, tracks)))
+    return report
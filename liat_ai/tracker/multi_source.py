@@ -0,0 +1,100 @@
+import queue
+import threading
+import numpy as np
+from utils import iter_video_frames, get_video_fps
+
+# Detector confidence floor that `model.track` forces (ultralytics uses 0.1 when no conf is given).
+# It matches track_low_thresh in custom_botsort.yaml: BoT-SORT's second association needs the
+# 0.1-0.25 boxes, so plain predict() calls feeding a standalone tracker must not use the 0.25 default.
+TRACK_CONF = 0.1
+
+
+def build_tracker(tracker_config, frame_rate=30):
+    """
+    Creates a standalone BoT-SORT / ByteTrack instance from a tracker yaml, the same way
+    ultralytics does inside `model.track`, so several sources can each keep their own state.
+    """
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+    from ultralytics.trackers.track import TRACKER_MAP
+
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(tracker_config)))
+    if getattr(cfg, "with_reid", False) and getattr(cfg, "model", None) == "auto":
+        # Native ReID features come from predictor hooks that plain batched predict() does not set up,
+        # so use the classifier ReID model the config comment names as the non-native fallback
+        cfg.model = "yolo11n-cls.pt"
+    return TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=frame_rate)
+
+
+def track_detections(tracker, source_tracker, detections, frame, names):
+    """
+    Feeds one frame's detections (a `Boxes` object) to a standalone tracker and converts
+    the tracked boxes to (players, referees, ball) dicts with `tracker.convert_arrays`.
+    """
+    tracked = np.zeros((0, 8), dtype=np.float32)
+    if len(detections):
+        tracked = np.asarray(source_tracker.update(detections, frame)).reshape(-1, 8)
+
+    # Tracker output rows are x1, y1, x2, y2, track_id, score, cls, detection_index
+    categories = tracker.class_lookup(names)[tracked[:, 6].astype(np.int64)]
+    return tracker.convert_arrays(tracked[:, :4], tracked[:, 5], categories, tracked[:, 4])
+
+
+class SourceReader:
+    """Decodes one video on its own thread into a small bounded queue; None marks the end."""
+    def __init__(self, video_path, max_queue=8):
+        self.video_path = video_path
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=f"SourceReader({video_path})", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            for frame in iter_video_frames(self.video_path):
+                self._queue.put(frame)
+        finally:
+            self._queue.put(None)
+
+    def get(self):
+        return self._queue.get()
+
+
+def track_sources_batched(tracker, video_paths, tracker_config, frames_per_source=1):
+    """
+    Tracks several videos at once. Sources are decoded concurrently, their frames are
+    batched into one detector call, and each source keeps its own tracker state.
+    Returns one `tracks` dict per source, in the order of `video_paths`.
+    """
+    readers = [SourceReader(path, max_queue=2 * frames_per_source) for path in video_paths]
+    trackers = [build_tracker(tracker_config, frame_rate=round(get_video_fps(path, default=30))) for path in video_paths]
+    all_tracks = [{"players": [], "referees": [], "ball": []} for _ in video_paths]
+    active = list(range(len(video_paths)))
+
+    while active:
+        batch_frames = []
+        batch_sources = []
+        for source in list(active):
+            for _ in range(frames_per_source):
+                frame = readers[source].get()
+                if frame is None:
+                    active.remove(source)
+                    break
+                batch_frames.append(frame)
+                batch_sources.append(source)
+
+        if not batch_frames:
+            break
+
+        # One detector call for the frames of every source; results come back in batch order,
+        # so each source's tracker still sees its frames sequentially
+        results = tracker.model.predict(batch_frames, conf=TRACK_CONF, verbose=False)
+
+        for source, frame, result in zip(batch_sources, batch_frames, results):
+            players_in_frame, referees_in_frame, ball_in_frame = track_detections(tracker, trackers[source], result.boxes.cpu().numpy(), frame, result.names)
+
+            tracks = all_tracks[source]
+            tracks["players"].append(players_in_frame)
+            tracks["referees"].append(referees_in_frame)
+            tracks["ball"].append(ball_in_frame)
+
+    return all_tracks
@@ -0,0 +1,136 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from utils import iter_video_frames, get_video_frame_count, box_iou_matrix
+
+TRACKED_CLASSES = ("players", "referees")
+
+
+def plan_chunks(total_frames, chunk_frames, overlap_frames):
+    """
+    Splits [0, total_frames) into (start, stop) chunks of `chunk_frames`, each extended by
+    `overlap_frames` into the next one. The last chunk has stop=None so it reads to EOF,
+    since CAP_PROP_FRAME_COUNT is only an estimate for some containers.
+    """
+    chunks = []
+    for start in range(0, max(total_frames, 1), chunk_frames):
+        stop = start + chunk_frames + overlap_frames
+        chunks.append((start, stop if stop < total_frames else None))
+    return chunks
+
+
+def _track_chunk(args):
+    """Process pool worker: tracks frames [start, stop) with its own model and BoT-SORT state."""
+    model_path, video_path, tracker_config, start, stop, num_threads = args
+
+    import torch
+    torch.set_num_threads(num_threads)
+    from .tracker import Tracker
+
+    tracker = Tracker(model_path)
+    frames = []
+    for frame in iter_video_frames(video_path, start, stop):
+        result = tracker.model.track(frame, tracker=tracker_config, persist=True, verbose=False)[0]
+        frames.append(tracker.convert_result(result))
+
+    print(f"Tracked frames {start} - {start + len(frames)}")
+    return start, frames
+
+
+def _match_overlap(prev_frames, cur_frames, class_index, min_iou):
+    """
+    Matches track IDs of one class across an overlap window.
+    Pairs are scored by their IoU summed over the window and assigned greedily,
+    keeping a pair only if its mean IoU over the window reaches `min_iou`.
+    """
+    scores = {}
+    for prev_frame, cur_frame in zip(prev_frames, cur_frames):
+        prev_objects = prev_frame[class_index]
+        cur_objects = cur_frame[class_index]
+        if not prev_objects or not cur_objects:
+            continue
+
+        prev_ids = list(prev_objects)
+        cur_ids = list(cur_objects)
+        ious = box_iou_matrix([o["bbox"] for o in prev_objects.values()], [o["bbox"] for o in cur_objects.values()])
+        for i, j in zip(*ious.nonzero()):
+            key = (prev_ids[i], cur_ids[j])
+            scores[key] = scores.get(key, 0.0) + float(ious[i, j])
+
+    window = max(len(cur_frames), 1)
+    id_map = {}
+    used_prev_ids = set()
+    for (prev_id, cur_id), score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+        if score / window < min_iou:
+            break
+        if prev_id in used_prev_ids or cur_id in id_map:
+            continue
+        id_map[cur_id] = prev_id
+        used_prev_ids.add(prev_id)
+    return id_map
+
+
+def stitch_chunks(chunks, overlap_frames, min_iou=0.5):
+    """
+    Joins per-chunk results (list of (start, frames), frames being (players, referees, ball)
+    tuples) into one `tracks` dict with consistent IDs.
+
+    Every chunk after the first starts with `overlap_frames` frames the previous chunk also
+    tracked. IDs are carried over by box overlap in that window; the previous chunk's
+    results are kept for the window itself, and unmatched tracks get fresh IDs.
+    """
+    tracks = {"players": [], "referees": [], "ball": []}
+    stitched = []
+    next_id = 1
+
+    for chunk_num, (start, frames) in enumerate(sorted(chunks, key=lambda chunk: chunk[0])):
+        if chunk_num == 0:
+            head = 0
+            id_maps = [{} for _ in TRACKED_CLASSES]
+        else:
+            head = min(overlap_frames, len(frames), len(stitched))
+            prev_window = stitched[len(stitched) - head:] if head else []
+            id_maps = [_match_overlap(prev_window, frames[:head], class_index, min_iou) for class_index in range(len(TRACKED_CLASSES))]
+
+        for class_index, id_map in enumerate(id_maps):
+            for frame in frames:
+                for track_id in frame[class_index]:
+                    if track_id not in id_map:
+                        id_map[track_id] = track_id if chunk_num == 0 else next_id
+                        next_id = max(next_id, id_map[track_id]) + 1
+
+        for frame in frames[head:]:
+            players, referees, ball = frame
+            stitched.append((
+                {id_maps[0][track_id]: obj for track_id, obj in players.items()},
+                {id_maps[1][track_id]: obj for track_id, obj in referees.items()},
+                ball,
+            ))
+
+    for players, referees, ball in stitched:
+        tracks["players"].append(players)
+        tracks["referees"].append(referees)
+        tracks["ball"].append(ball)
+    return tracks
+
+
+def track_video_parallel(model_path, video_path, tracker_config, num_workers=None, chunk_frames=None, overlap_frames=15, min_iou=0.5):
+    """
+    Runs detection + tracking over time chunks of the video in a process pool and stitches
+    the track IDs back together. Returns the same `tracks` structure as `get_object_tracks`.
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    total_frames = get_video_frame_count(video_path)
+    if chunk_frames is None:
+        chunk_frames = max(overlap_frames + 1, -(-total_frames // num_workers))
+
+    chunks = plan_chunks(total_frames, chunk_frames, overlap_frames)
+    num_threads = max(1, (os.cpu_count() or 1) // min(num_workers, len(chunks)))
+    print(f"Tracking {video_path} in {len(chunks)} chunks on {num_workers} workers...")
+
+    jobs = [(model_path, video_path, tracker_config, start, stop, num_threads) for start, stop in chunks]
+    # spawn avoids forking an initialised torch/OpenCV runtime into the workers
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(_track_chunk, jobs))
+
+    return stitch_chunks(results, overlap_frames, min_iou)
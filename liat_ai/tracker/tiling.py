@@ -0,0 +1,145 @@
+import cv2
+import numpy as np
+from utils import non_max_suppression, box_ios_matrix
+from .multi_source import TRACK_CONF
+
+# HSV range of pitch grass
+PITCH_HSV_LOW = (35, 40, 40)
+PITCH_HSV_HIGH = (85, 255, 255)
+
+
+def find_pitch_roi(frame, margin=0.03, min_area=0.15):
+    """
+    Bounding box (x1, y1, x2, y2) of the largest grass-coloured region, grown by `margin`
+    of the frame size (more at the top, where players stand in front of the far touchline).
+    Falls back to the full frame when no region covers `min_area` of it.
+    """
+    height, width = frame.shape[:2]
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, PITCH_HSV_LOW, PITCH_HSV_HIGH)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((25, 25), dtype=np.uint8))
+
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return 0, 0, width, height
+    largest = max(contours, key=cv2.contourArea)
+    if cv2.contourArea(largest) < min_area * width * height:
+        return 0, 0, width, height
+
+    x, y, w, h = cv2.boundingRect(largest)
+    pad_x = int(margin * width)
+    pad_y = int(margin * height)
+    return max(0, x - pad_x), max(0, y - 3 * pad_y), min(width, x + w + pad_x), min(height, y + h + pad_y)
+
+
+def _tile_starts(low, high, tile, stride):
+    if high - low <= tile:
+        return [low]
+    starts = list(range(low, high - tile, stride))
+    starts.append(high - tile)
+    return starts
+
+
+def make_tiles(roi, tile_size=640, overlap=0.2):
+    """Overlapping tile_size x tile_size windows covering `roi` at native resolution."""
+    x1, y1, x2, y2 = roi
+    stride = max(1, int(tile_size * (1 - overlap)))
+    return [
+        (tx, ty, min(tx + tile_size, x2), min(ty + tile_size, y2))
+        for ty in _tile_starts(y1, y2, tile_size, stride)
+        for tx in _tile_starts(x1, x2, tile_size, stride)
+    ]
+
+
+def _same_object_fragments(a, b, threshold):
+    """Two fragments of one object overlap and either span nearly the same extent along the axis they were not cut on, or one lies inside the other."""
+    overlap_x = min(a[2], b[2]) - max(a[0], b[0])
+    overlap_y = min(a[3], b[3]) - max(a[1], b[1])
+    if overlap_x <= 0 or overlap_y <= 0:
+        return False
+    iou_x = overlap_x / (max(a[2], b[2]) - min(a[0], b[0]))
+    iou_y = overlap_y / (max(a[3], b[3]) - min(a[1], b[1]))
+    contained = box_ios_matrix(a[:4], b[:4])[0, 0] >= threshold
+    return contained or iou_x >= threshold or iou_y >= threshold
+
+
+def merge_cut_boxes(detections, cut, iou_threshold=0.5, cover_threshold=0.7):
+    """
+    Merges the per-tile detections of a frame ((N, 6) x1, y1, x2, y2, conf, cls, plus a `cut`
+    mask for boxes touching an inner tile edge) into one box per object.
+
+    Whole boxes go through class-aware NMS. A cut box is only a fragment, so it is dropped when
+    a whole box of the same class covers it (intersection over the fragment's area). The
+    remaining fragments of one class are union-merged while they overlap and line up along the
+    uncut axis: an object larger than the tile overlap is cut in every tile that sees it and is
+    rebuilt from those fragments.
+    """
+    whole = detections[~cut]
+    whole = whole[non_max_suppression(whole[:, :4], whole[:, 4], whole[:, 5], iou_threshold)]
+
+    fragments = detections[cut]
+    if len(fragments) and len(whole):
+        same_class = fragments[:, None, 5] == whole[None, :, 5]
+        covered = ((box_ios_matrix(fragments[:, :4], whole[:, :4]) >= cover_threshold) & same_class).any(axis=1)
+        fragments = fragments[~covered]
+
+    merged = []
+    for class_id in np.unique(fragments[:, 5]):
+        boxes = list(fragments[fragments[:, 5] == class_id])
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(boxes)):
+                for j in range(i + 1, len(boxes)):
+                    if _same_object_fragments(boxes[i], boxes[j], cover_threshold):
+                        a, b = boxes[i], boxes.pop(j)
+                        boxes[i] = np.array([min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]), max(a[4], b[4]), class_id], dtype=np.float32)
+                        changed = True
+                        break
+                if changed:
+                    break
+        merged.extend(boxes)
+
+    if not merged:
+        return whole
+    return np.concatenate([whole, np.asarray(merged, dtype=np.float32).reshape(-1, 6)])
+
+
+def detect_tiled(model, frame, tiles, roi, tile_size=640, iou_threshold=0.5, edge_margin=2, conf=TRACK_CONF):
+    """
+    Runs the detector on all tiles of a frame in one batched call and merges the results.
+
+    Boxes touching a tile edge that lies inside the ROI are cut-off objects. They are kept as
+    fragments and combined by `merge_cut_boxes`: fragments covered by a whole box from a
+    neighbouring tile are dropped, the others are union-merged, so objects larger than the
+    overlap are not lost. Detection runs at `conf` (the tracking floor, as in `model.track`) so
+    low-score boxes, often the distant ball, still reach BoT-SORT.
+    Returns an (N, 6) array of x1, y1, x2, y2, conf, cls in frame coordinates.
+    """
+    crops = [frame[ty1:ty2, tx1:tx2] for tx1, ty1, tx2, ty2 in tiles]
+    results = model.predict(crops, imgsz=tile_size, conf=conf, verbose=False)
+
+    merged = []
+    cut_masks = []
+    for (tx1, ty1, tx2, ty2), result in zip(tiles, results):
+        boxes = result.boxes.cpu().numpy()
+        if not len(boxes):
+            continue
+        xyxy = boxes.xyxy + np.array([tx1, ty1, tx1, ty1], dtype=np.float32)
+
+        cut = np.zeros(len(xyxy), dtype=bool)
+        if tx1 > roi[0]:
+            cut |= xyxy[:, 0] <= tx1 + edge_margin
+        if ty1 > roi[1]:
+            cut |= xyxy[:, 1] <= ty1 + edge_margin
+        if tx2 < roi[2]:
+            cut |= xyxy[:, 2] >= tx2 - edge_margin
+        if ty2 < roi[3]:
+            cut |= xyxy[:, 3] >= ty2 - edge_margin
+
+        merged.append(np.column_stack([xyxy, boxes.conf, boxes.cls]))
+        cut_masks.append(cut)
+
+    if not merged:
+        return np.zeros((0, 6), dtype=np.float32)
+    return merge_cut_boxes(np.concatenate(merged).astype(np.float32), np.concatenate(cut_masks), iou_threshold)
@@ -0,0 +1,194 @@
+import os
+import json
+import numpy as np
+
+TRACK_CLASSES = ("players", "referees", "ball")
+
+COLUMN_DTYPES = {
+    "frame": np.int32,
+    "track_id": np.int32,
+    "cls": np.int8,
+    "x1": np.float32,
+    "y1": np.float32,
+    "x2": np.float32,
+    "y2": np.float32,
+    "confidence": np.float32,
+}
+
+
+class TrackStore:
+    """
+    Columnar store for tracking results: one row per tracked object, rows sorted by frame.
+
+    Rows of frame `f` are `frame_offsets[f]:frame_offsets[f + 1]`, so selecting a frame
+    range is O(1) and returns views. Each column is saved as its own .npy file, which lets
+    `load` memory-map them instead of unpickling the whole match.
+    """
+    def __init__(self, columns, frame_offsets, first_frame=0, meta=None):
+        self.columns = columns
+        self.frame_offsets = frame_offsets
+        self.first_frame = first_frame
+        self.meta = meta or {}
+        self._track_index = None
+
+    @property
+    def num_frames(self):
+        return len(self.frame_offsets) - 1
+
+    @property
+    def num_rows(self):
+        return int(self.frame_offsets[-1] - self.frame_offsets[0])
+
+    def __len__(self):
+        return self.num_frames
+
+    @classmethod
+    def from_frames(cls, frames, first_frame=0):
+        """
+        Builds a store from an iterable of (players, referees, ball) per-frame dicts,
+        i.e. the output of `Tracker.convert_result`.
+        """
+        rows = {name: [] for name in COLUMN_DTYPES}
+        frame_offsets = [0]
+
+        for frame_num, frame_dicts in enumerate(frames):
+            for class_index, objects in enumerate(frame_dicts):
+                for track_id, obj in objects.items():
+                    x1, y1, x2, y2 = obj["bbox"]
+                    rows["frame"].append(first_frame + frame_num)
+                    rows["track_id"].append(int(track_id))
+                    rows["cls"].append(class_index)
+                    rows["x1"].append(x1)
+                    rows["y1"].append(y1)
+                    rows["x2"].append(x2)
+                    rows["y2"].append(y2)
+                    rows["confidence"].append(obj["confidence"])
+            frame_offsets.append(len(rows["frame"]))
+
+        columns = {name: np.asarray(rows[name], dtype=dtype) for name, dtype in COLUMN_DTYPES.items()}
+        return cls(columns, np.asarray(frame_offsets, dtype=np.int64), first_frame)
+
+    @classmethod
+    def from_tracks(cls, tracks):
+        """Builds a store from the `{"players": [...], "referees": [...], "ball": [...]}` dict."""
+        return cls.from_frames(zip(*(tracks[name] for name in TRACK_CLASSES)))
+
+    def frame_rows(self, frame_num):
+        """Row slice of one frame (relative to this store)."""
+        start = self.frame_offsets[frame_num] - self.frame_offsets[0]
+        stop = self.frame_offsets[frame_num + 1] - self.frame_offsets[0]
+        return slice(int(start), int(stop))
+
+    def frame_range(self, start, stop):
+        """
+        Returns a store over frames [start, stop) whose columns are views into this one.
+        Bounds are clamped like slice indices, so an empty or reversed range gives an empty store.
+        """
+        start = min(max(0, start), self.num_frames)
+        stop = max(min(self.num_frames, stop), start)
+        rows = slice(int(self.frame_offsets[start] - self.frame_offsets[0]), int(self.frame_offsets[stop] - self.frame_offsets[0]))
+        columns = {name: column[rows] for name, column in self.columns.items()}
+        return TrackStore(columns, self.frame_offsets[start:stop + 1], self.first_frame + start)
+
+    def bboxes(self, rows=slice(None)):
+        """(N, 4) array of x1, y1, x2, y2 for the given rows."""
+        return np.stack([self.columns[name][rows] for name in ("x1", "y1", "x2", "y2")], axis=1)
+
+    def _build_track_index(self):
+        order = np.lexsort((self.columns["frame"], self.columns["track_id"], self.columns["cls"]))
+        cls_sorted = self.columns["cls"][order]
+        id_sorted = self.columns["track_id"][order]
+        boundaries = np.flatnonzero((np.diff(cls_sorted) != 0) | (np.diff(id_sorted) != 0)) + 1
+        starts = np.concatenate(([0], boundaries)).astype(np.int64)
+        stops = np.concatenate((boundaries, [len(order)])).astype(np.int64)
+
+        index = {}
+        if len(order):
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                index[(int(cls_sorted[start]), int(id_sorted[start]))] = (start, stop)
+        self._track_index = (order, index)
+
+    def track(self, track_id, track_class="players"):
+        """
+        Returns the rows of one track as a dict of column arrays, ordered by frame.
+        The per-track index is built once on first use; lookups afterwards are a dict hit.
+        """
+        if self._track_index is None:
+            self._build_track_index()
+        order, index = self._track_index
+
+        span = index.get((TRACK_CLASSES.index(track_class), int(track_id)))
+        if span is None:
+            return {name: column[:0] for name, column in self.columns.items()}
+        rows = order[span[0]:span[1]]
+        return {name: column[rows] for name, column in self.columns.items()}
+
+    def track_ids(self, track_class="players"):
+        return np.unique(self.columns["track_id"][self.columns["cls"] == TRACK_CLASSES.index(track_class)])
+
+    def frame_dict(self, frame_num, track_class):
+        """Returns `{track_id: {"bbox": [...], "confidence": c}}` for one frame and class."""
+        rows = self.frame_rows(frame_num)
+        mask = self.columns["cls"][rows] == TRACK_CLASSES.index(track_class)
+        track_ids = self.columns["track_id"][rows][mask].tolist()
+        bboxes = self.bboxes(rows)[mask].tolist()
+        confidences = self.columns["confidence"][rows][mask].tolist()
+        return {track_id: {"bbox": bbox, "confidence": confidence} for track_id, bbox, confidence in zip(track_ids, bboxes, confidences)}
+
+    def iter_frames(self):
+        """Yields (players, referees, ball) dicts per frame, the inverse of `from_frames`."""
+        for frame_num in range(self.num_frames):
+            yield tuple(self.frame_dict(frame_num, name) for name in TRACK_CLASSES)
+
+    def as_tracks(self):
+        """Dict view with the same shape as `Tracker.get_object_tracks` output."""
+        return {name: TrackClassView(self, name) for name in TRACK_CLASSES}
+
+    def save(self, path, meta=None):
+        """Saves the columns as .npy files; `meta` is stored alongside (e.g. a cache key)."""
+        os.makedirs(path, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(column))
+        np.save(os.path.join(path, "frame_offsets.npy"), np.asarray(self.frame_offsets) - self.frame_offsets[0])
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"num_frames": self.num_frames, "first_frame": self.first_frame, "classes": list(TRACK_CLASSES), **(meta or {})}, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        mmap_mode = "r" if mmap else None
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in COLUMN_DTYPES}
+        frame_offsets = np.load(os.path.join(path, "frame_offsets.npy"), mmap_mode=mmap_mode)
+        return cls(columns, frame_offsets, meta.get("first_frame", 0), meta)
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, "meta.json"))
+
+
+class TrackClassView:
+    """
+    Read-only, list-like view of one class in a TrackStore.
+    `view[frame_num]` builds that frame's `{track_id: {"bbox", "confidence"}}` dict on demand,
+    which is all `Tracker.draw_annotations` needs.
+    """
+    def __init__(self, store, track_class):
+        self.store = store
+        self.track_class = track_class
+
+    def __len__(self):
+        return self.store.num_frames
+
+    def __getitem__(self, frame_num):
+        if isinstance(frame_num, slice):
+            return [self[i] for i in range(*frame_num.indices(len(self)))]
+        if frame_num < 0:
+            frame_num += len(self)
+        if not 0 <= frame_num < len(self):
+            raise IndexError("frame index out of range")
+        return self.store.frame_dict(frame_num, self.track_class)
+
+    def __iter__(self):
+        for frame_num in range(len(self)):
+            yield self.store.frame_dict(frame_num, self.track_class)
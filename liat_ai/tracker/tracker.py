@@ -1,21 +1,56 @@
 import os
+import time
 import pickle
 import cv2
 from ultralytics import YOLO
-import supervision as sv
 import numpy as np
-from utils import get_center_of_bbox, get_bbox_width
+from utils import get_center_of_bbox, get_bbox_width, iter_video_frames, get_video_fps
+from .track_store import TrackStore
+from .parallel import track_video_parallel, stitch_chunks
+from .cache import TrackCache, cache_key
+from .export import BACKENDS, export_cpu_model
+from .motion import MotionPropagator, motion_thumbnail, motion_score
+from .renderer import AnnotationRenderer
+from .multi_source import track_sources_batched, build_tracker, track_detections
+from .tiling import find_pitch_roi, make_tiles, detect_tiled
 
 class Tracker:
-    def __init__(self, model_path):
-        self.model = YOLO(model_path)
+    def __init__(self, model_path, model=None, backend="pytorch", int8=False):
+        # `model` lets callers pass an already built detector (e.g. the benchmark stub) instead of loading weights
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+        if model is None and backend == "onnx" and model_path.endswith(".pt"):
+            # Exported once and cached; model_path then points at the exported file so the
+            # tracking cache key and parallel workers use the same backend
+            model_path = export_cpu_model(model_path, int8=int8)
+
+        self.model_path = model_path
+        self.model = model if model is not None else YOLO(model_path, task="detect")
+        self._class_lookup = None
+        self.renderer = AnnotationRenderer()
+
+    def get_object_tracks(self, video_path, tracker_config, read_from_stub=False, stub_path=None, cache_dir=None, checkpoint_every=1000):
+        # cache_dir takes precedence: a content-addressed cache that also resumes interrupted runs
+        if cache_dir is not None:
+            return self.get_object_tracks_cached(video_path, tracker_config, cache_dir, checkpoint_every)
+
+        # stub_path ending in .pkl keeps the legacy pickle stub, anything else is a TrackStore directory
+        legacy_stub = stub_path is not None and stub_path.endswith(".pkl")
+        stub_key = cache_key(video_path, self.model_path, tracker_config, self.model) if stub_path is not None and not legacy_stub else None
 
-    def get_object_tracks(self, video_path, tracker_config, read_from_stub=False, stub_path=None):
         if read_from_stub and stub_path is not None and os.path.exists(stub_path):
-            with open(stub_path,'rb') as f:
-                tracks = pickle.load(f)
-            print(f"Loaded tracks from stub: {stub_path}")
-            return tracks
+            if legacy_stub:
+                print("Warning: legacy .pkl stubs are not checked against the video, model or tracker config.")
+                with open(stub_path,'rb') as f:
+                    tracks = pickle.load(f)
+                print(f"Loaded tracks from stub: {stub_path}")
+                return tracks
+
+            store = TrackStore.load(stub_path)
+            if store.meta.get("cache_key") == stub_key:
+                print(f"Loaded tracks from stub: {stub_path}")
+                return store.as_tracks()
+            print(f"Warning: stub {stub_path} was made from a different video, model or tracker config. Re-running tracking.")
 
         print(f"Performing tracking on {video_path}...")
 
@@ -34,38 +69,7 @@ class Tracker:
             # Custom Print progress if verbose=False
             # print(f"Processing frame {frame_num + 1} / {total_frames}", end='\r')
 
-            cls_names = result.names
-            cls_names_inv = {v:k for k, v in cls_names.items()}
-
-            # Convert to Supervision Detection Format
-            detection_supervision = sv.Detections.from_ultralytics(result)
-
-            # Convert GoalKeeper to Player Object
-            for object_ind, class_id in enumerate(detection_supervision.class_id):
-                if cls_names[class_id] == "goalkeeper":
-                    detection_supervision.class_id[object_ind] = cls_names_inv["player"]
-
-            # Process tracked objects
-            players_in_frame = {}
-            referees_in_frame = {}
-            ball_in_frame = {}
-
-            if result.boxes.id is not None: # Check if tracking results are available
-                for bbox, confidence, class_id, tracker_id in zip(result.boxes.xyxy.tolist(), result.boxes.conf.tolist(), result.boxes.cls.tolist(), result.boxes.id.tolist()):
-                    class_name = cls_names[class_id]
-
-                    if class_name == 'player':
-                        players_in_frame[tracker_id] = {"bbox": bbox, "confidence": confidence}
-                    elif class_name == 'referee':
-                        referees_in_frame[tracker_id] = {"bbox": bbox, "confidence": confidence}
-
-            # Process ball detections (ball does not have track_id)
-            for bbox, confidence, class_id in zip(detection_supervision.xyxy.tolist(), detection_supervision.confidence.tolist(), detection_supervision.class_id.tolist()):
-                class_name = cls_names[class_id]
-                if class_name == 'ball':
-                    # Assuming only one ball, assign a fixed ID like 1
-                    ball_in_frame[1] = {"bbox": bbox, "confidence": confidence}
-
+            players_in_frame, referees_in_frame, ball_in_frame = self.convert_result(result)
 
             tracks["players"].append(players_in_frame)
             tracks["referees"].append(referees_in_frame)
@@ -76,15 +80,252 @@ class Tracker:
 
         if stub_path is not None:
             print(f"Saving tracks to stub: {stub_path}")
-            # Ensure the directory exists
-            os.makedirs(os.path.dirname(stub_path), exist_ok=True)
-            with open(stub_path,'wb') as f:
-                pickle.dump(tracks,f)
+            if legacy_stub:
+                # Ensure the directory exists
+                os.makedirs(os.path.dirname(stub_path), exist_ok=True)
+                with open(stub_path,'wb') as f:
+                    pickle.dump(tracks,f)
+            else:
+                TrackStore.from_tracks(tracks).save(stub_path, meta={"cache_key": stub_key})
             print("Stub saved.")
 
 
         return tracks
 
+    def get_object_tracks_cached(self, video_path, tracker_config, cache_dir, checkpoint_every=1000, resume_overlap=15):
+        """
+        `get_object_tracks` backed by a `TrackCache` keyed on the video, model and tracker config
+        contents. Partial results are checkpointed every `checkpoint_every` frames; after a crash
+        tracking restarts `resume_overlap` frames before the last checkpoint and the new track IDs
+        are stitched onto the old ones over that overlap.
+        """
+        cache = TrackCache(cache_dir, cache_key(video_path, self.model_path, tracker_config, self.model))
+        store = cache.load()
+        if store is not None:
+            print(f"Loaded tracks from cache: {cache.path}")
+            return store.as_tracks()
+
+        frames_done = cache.frames_done()
+        start = max(0, frames_done - resume_overlap)
+        if frames_done:
+            print(f"Resuming {video_path} from checkpoint at frame {frames_done}...")
+        else:
+            print(f"Performing tracking on {video_path}...")
+
+        self.reset_tracker_state()
+        cache.start_run(start)
+        pending = []
+        segment_start = start
+        for frame in iter_video_frames(video_path, start):
+            result = self.model.track(frame, tracker=tracker_config, persist=True, verbose=False)[0]
+            pending.append(self.convert_result(result))
+
+            if len(pending) >= checkpoint_every:
+                cache.save_segment(pending, segment_start)
+                segment_start += len(pending)
+                pending = []
+                print(f"Checkpoint saved at frame {segment_start}")
+
+        if pending:
+            cache.save_segment(pending, segment_start)
+
+        tracks = stitch_chunks(cache.load_runs(), resume_overlap)
+        cache.finish(tracks)
+        print(f"Tracks cached in {cache.path}")
+        return tracks
+
+    def get_object_tracks_parallel(self, video_path, tracker_config, num_workers=None, chunk_frames=None, overlap_frames=15):
+        """
+        CPU parallel variant of `get_object_tracks`: the video is split into overlapping time
+        chunks tracked in a process pool, then track IDs are stitched across chunk boundaries.
+        """
+        print(f"Performing parallel tracking on {video_path}...")
+        return track_video_parallel(self.model_path, video_path, tracker_config, num_workers, chunk_frames, overlap_frames)
+
+    def get_object_tracks_multi(self, video_paths, tracker_config, frames_per_source=1):
+        """
+        Tracks several camera angles in one pass: sources are decoded concurrently and their
+        frames batched into one detector call, while every source keeps its own tracker state.
+        Returns a list of `tracks` dicts, one per entry of `video_paths`.
+        """
+        print(f"Performing batched tracking on {len(video_paths)} sources...")
+        return track_sources_batched(self, video_paths, tracker_config, frames_per_source)
+
+    def get_object_tracks_tiled(self, video_path, tracker_config, tile_size=640, overlap=0.2, roi=None):
+        """
+        Inference mode for high-resolution footage. The pitch region is found once on the first
+        frame (or passed as `roi`) and covered with overlapping native-resolution tiles. The tiles
+        are batched into one detector call and merged (NMS plus cut-fragment merging) before BoT-SORT, so small objects
+        such as the ball are not lost to downsampling.
+        """
+        from ultralytics.engine.results import Boxes
+
+        print(f"Performing tiled tracking on {video_path}...")
+        source_tracker = build_tracker(tracker_config, frame_rate=round(get_video_fps(video_path, default=30)))
+        tracks = {
+            "players": [],
+            "referees": [],
+            "ball": []
+        }
+        tiles = None
+
+        for frame in iter_video_frames(video_path):
+            if tiles is None:
+                roi = roi or find_pitch_roi(frame)
+                tiles = make_tiles(roi, tile_size, overlap)
+                print(f"Pitch ROI {roi}, {len(tiles)} tiles of {tile_size}px")
+
+            detections = detect_tiled(self.model, frame, tiles, roi, tile_size)
+            players_in_frame, referees_in_frame, ball_in_frame = track_detections(
+                self, source_tracker, Boxes(detections, frame.shape[:2]), frame, self.model.names
+            )
+
+            tracks["players"].append(players_in_frame)
+            tracks["referees"].append(referees_in_frame)
+            tracks["ball"].append(ball_in_frame)
+
+        return tracks
+
+    def reset_tracker_state(self):
+        """Drops BoT-SORT state kept by `persist=True` so the next run starts with fresh IDs."""
+        for tracker in getattr(self.model.predictor, "trackers", None) or []:
+            tracker.reset()
+
+    def get_object_tracks_adaptive(self, video_path, tracker_config, detect_every=3, motion_threshold=None, method="optical_flow"):
+        """
+        Opt-in variant of `get_object_tracks` that only runs the detector + tracker every
+        `detect_every` frames, or earlier when the motion score against the last detector
+        frame exceeds `motion_threshold` (pans, scene cuts). Frames in between get boxes
+        propagated by `MotionPropagator`.
+        Returns (tracks, stats) where stats holds frame count, detector calls and fps.
+        """
+        print(f"Performing adaptive tracking on {video_path} (detect every {detect_every} frames)...")
+        self.reset_tracker_state()
+        tracks = {
+            "players": [],
+            "referees": [],
+            "ball": []
+        }
+        propagator = MotionPropagator(method)
+        key_frame = None
+        key_thumbnail = None
+        detector_calls = 0
+        start_time = time.perf_counter()
+
+        for frame_num, frame in enumerate(iter_video_frames(video_path)):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if method == "optical_flow" else None
+            thumbnail = motion_thumbnail(frame) if motion_threshold is not None else None
+
+            run_detector = key_frame is None or frame_num - key_frame >= detect_every
+            if not run_detector and motion_threshold is not None:
+                run_detector = motion_score(key_thumbnail, thumbnail) > motion_threshold
+
+            if run_detector:
+                result = self.model.track(frame, tracker=tracker_config, persist=True, verbose=False)[0]
+                frame_dicts = self.convert_result(result)
+                propagator.update(frame_dicts, gray, frame_num)
+                key_frame = frame_num
+                key_thumbnail = thumbnail
+                detector_calls += 1
+            else:
+                frame_dicts = propagator.propagate(gray, frame_num)
+
+            players_in_frame, referees_in_frame, ball_in_frame = frame_dicts
+            tracks["players"].append(players_in_frame)
+            tracks["referees"].append(referees_in_frame)
+            tracks["ball"].append(ball_in_frame)
+
+        elapsed = time.perf_counter() - start_time
+        frames = len(tracks["players"])
+        stats = {
+            "frames": frames,
+            "detector_calls": detector_calls,
+            "seconds": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+        }
+        print(f"Adaptive tracking done: {frames} frames, {detector_calls} detector calls, {stats['fps']:.1f} fps")
+        return tracks, stats
+
+    def class_lookup(self, names):
+        """
+        Lookup table from model class id to the index of the `tracks` key it belongs to
+        (0 players, 1 referees, 2 ball, -1 ignored). Goalkeepers map to -1: the original
+        per-object loop only kept boxes whose class was "player", so they never reached `tracks`.
+        Built once per model and reused for every frame.
+        """
+        if self._class_lookup is None or self._class_lookup[0] is not names:
+            lookup = np.full(max(names) + 1, -1, dtype=np.int8)
+            for class_id, class_name in names.items():
+                if class_name == "player":
+                    lookup[class_id] = 0
+                elif class_name == "referee":
+                    lookup[class_id] = 1
+                elif class_name == "ball":
+                    lookup[class_id] = 2
+            self._class_lookup = (names, lookup)
+        return self._class_lookup[1]
+
+    def convert_result(self, result):
+        """
+        Converts one ultralytics tracking result into the per-frame
+        players / referees / ball dicts used by `tracks`.
+        """
+        if result.boxes is None or len(result.boxes) == 0:
+            return {}, {}, {}
+
+        boxes = result.boxes.cpu().numpy()
+        categories = self.class_lookup(result.names)[boxes.cls.astype(np.int64)]
+        return self.convert_arrays(boxes.xyxy, boxes.conf, categories, boxes.id)
+
+    @staticmethod
+    def convert_arrays(xyxy, confidence, categories, track_ids):
+        """
+        Array version of `convert_result`: splits detections into players / referees / ball
+        with boolean masks, so there is no per-object branching in Python.
+        `categories` holds the `class_lookup` index of each detection, `track_ids` may be None.
+        """
+        players_in_frame = {}
+        referees_in_frame = {}
+        ball_in_frame = {}
+
+        if track_ids is not None: # Check if tracking results are available
+            track_ids = track_ids.astype(np.int64)
+            for category, objects in ((0, players_in_frame), (1, referees_in_frame)):
+                mask = categories == category
+                objects.update(zip(
+                    track_ids[mask].tolist(),
+                    ({"bbox": bbox, "confidence": conf} for bbox, conf in zip(xyxy[mask].tolist(), confidence[mask].tolist()))
+                ))
+
+        # Ball does not have a track_id: assuming only one ball, the last detection gets a fixed ID of 1
+        ball_indices = np.flatnonzero(categories == 2)
+        if len(ball_indices):
+            ball_index = ball_indices[-1]
+            ball_in_frame[1] = {"bbox": xyxy[ball_index].tolist(), "confidence": float(confidence[ball_index])}
+
+        return players_in_frame, referees_in_frame, ball_in_frame
+
+    def stream_annotated_frames(self, video_path, tracker_config, tracks=None):
+        """
+        Single-pass streaming pipeline: decode -> track -> annotate, one frame at a time.
+        ultralytics decodes the video once and hands back the decoded frame as
+        `result.orig_img`, which is annotated in place and yielded straight away,
+        so memory stays constant regardless of video length.
+        If a `tracks` dict is passed, the per-frame results are appended to it.
+        """
+        print(f"Streaming {video_path}...")
+        results = self.model.track(source=video_path, tracker=tracker_config, persist=True, stream=True, verbose=False)
+
+        for result in results:
+            players_in_frame, referees_in_frame, ball_in_frame = self.convert_result(result)
+
+            if tracks is not None:
+                tracks["players"].append(players_in_frame)
+                tracks["referees"].append(referees_in_frame)
+                tracks["ball"].append(ball_in_frame)
+
+            yield self.renderer.render_frame(result.orig_img, players_in_frame, referees_in_frame, ball_in_frame)
+
     def draw_ellipse(self, frame, bbox, color, track_id=None):
         y2 = int(bbox[3])
         x_center, _ = get_center_of_bbox(bbox)
@@ -146,34 +387,35 @@ class Tracker:
 
         return frame
 
-    def draw_annotations(self, video_frames, tracks):
-        output_video_frames = []
-        print("Drawing annotations...")
-        for frame_num, frame in enumerate(video_frames):
-            print(f"Annotating frame {frame_num + 1} / {len(video_frames)}", end='\r')
-            frame = frame.copy()
-
-            player_dict = tracks["players"][frame_num]
-            ball_dict = tracks["ball"][frame_num]
-            referee_dict = tracks["referees"][frame_num]
-
-            # Draw Players
-            for track_id, player in player_dict.items():
-                frame = self.draw_ellipse(frame, player["bbox"], (0,0,255), track_id)
-
-            # Draw Referee
-            for track_id, referee in referee_dict.items():
-                 frame = self.draw_ellipse(frame, referee["bbox"], (0, 255, 255), track_id)
-
-            # Draw ball
-            for track_id, ball in ball_dict.items():
-                ball_bbox = ball["bbox"]
-                # Add a check to ensure ball_bbox is not empty or None
-                if ball_bbox:
-                    frame = self.draw_traingle(frame, ball_bbox, (0, 255, 0))
+    def draw_frame_annotations(self, frame, player_dict, referee_dict, ball_dict):
+        """
+        Draws one frame's players, referees and ball onto `frame` in place, one OpenCV call
+        per shape. Kept as the reference for `AnnotationRenderer`.
+        """
+        # Draw Players
+        for track_id, player in player_dict.items():
+            frame = self.draw_ellipse(frame, player["bbox"], (0,0,255), track_id)
+
+        # Draw Referee
+        for track_id, referee in referee_dict.items():
+             frame = self.draw_ellipse(frame, referee["bbox"], (0, 255, 255), track_id)
+
+        # Draw ball
+        for track_id, ball in ball_dict.items():
+            ball_bbox = ball["bbox"]
+            # Add a check to ensure ball_bbox is not empty or None
+            if ball_bbox:
+                frame = self.draw_traingle(frame, ball_bbox, (0, 255, 0))
 
+        return frame
 
-            output_video_frames.append(frame)
-        print("\nAnnotation complete.")
+    def draw_annotations(self, video_frames, tracks, in_place=False):
+        """
+        Draws tracks on every frame with the cached-sprite `AnnotationRenderer`, spread over a
+        thread pool. Pass in_place=True when the caller no longer needs the raw frames.
+        """
+        print("Drawing annotations...")
+        output_video_frames = self.renderer.render_frames(video_frames, tracks, in_place)
+        print("Annotation complete.")
 
-        return output_video_frames
\ No newline at end of file
+        return output_video_frames
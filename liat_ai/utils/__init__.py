@@ -1,2 +1,2 @@
-from .bbox_utils import get_center_of_bbox, get_bbox_width
-from .video_utils import read_video, save_video
\ No newline at end of file
+from .bbox_utils import get_center_of_bbox, get_bbox_width, get_centers_of_bboxes, get_bbox_widths, box_iou_matrix, box_ios_matrix, match_boxes_greedy, non_max_suppression
+from .video_utils import read_video, save_video, iter_video_frames, save_video_stream, get_video_fps, get_video_frame_count, AsyncVideoWriter
@@ -1,6 +1,80 @@
+import numpy as np
+
 def get_center_of_bbox(bbox):
     x1, y1, x2, y2 = bbox
     return int((x1 + x2)/2), int((y1 + y2)/2)
 
 def get_bbox_width(bbox):
-    return bbox[2] - bbox[0]
\ No newline at end of file
+    return bbox[2] - bbox[0]
+
+def get_centers_of_bboxes(bboxes):
+    """Vectorized `get_center_of_bbox` for an (N, 4) array; keeps float precision."""
+    bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    return np.stack([(bboxes[:, 0] + bboxes[:, 2]) / 2, (bboxes[:, 1] + bboxes[:, 3]) / 2], axis=1)
+
+def get_bbox_widths(bboxes):
+    """Vectorized `get_bbox_width` for an (N, 4) array."""
+    bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+    return bboxes[:, 2] - bboxes[:, 0]
+
+def _intersections_and_areas(boxes_a, boxes_b):
+    """Pairwise intersection areas (len(a), len(b)) and the areas of each set of x1, y1, x2, y2 boxes."""
+    boxes_a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x1 = np.maximum(boxes_a[:, None, 0], boxes_b[None, :, 0])
+    y1 = np.maximum(boxes_a[:, None, 1], boxes_b[None, :, 1])
+    x2 = np.minimum(boxes_a[:, None, 2], boxes_b[None, :, 2])
+    y2 = np.minimum(boxes_a[:, None, 3], boxes_b[None, :, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    return intersection, area_a, area_b
+
+def box_iou_matrix(boxes_a, boxes_b):
+    """Pairwise IoU between two sets of x1, y1, x2, y2 boxes, shape (len(a), len(b))."""
+    intersection, area_a, area_b = _intersections_and_areas(boxes_a, boxes_b)
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1e-9), 0.0)
+
+def box_ios_matrix(boxes_a, boxes_b):
+    """Pairwise intersection over the smaller box's area, shape (len(a), len(b)). 1.0 when one box contains the other."""
+    intersection, area_a, area_b = _intersections_and_areas(boxes_a, boxes_b)
+    smaller = np.minimum(area_a[:, None], area_b[None, :])
+    return np.where(smaller > 0, intersection / np.maximum(smaller, 1e-9), 0.0)
+
+def match_boxes_greedy(iou, min_iou=0.0):
+    """Greedy one-to-one matching on an IoU matrix, best pairs first. Returns (rows, cols)."""
+    rows, cols = np.nonzero(iou > min_iou)
+    order = np.argsort(-iou[rows, cols], kind="stable")
+    used_rows, used_cols = set(), set()
+    matched_rows, matched_cols = [], []
+    for row, col in zip(rows[order].tolist(), cols[order].tolist()):
+        if row in used_rows or col in used_cols:
+            continue
+        used_rows.add(row)
+        used_cols.add(col)
+        matched_rows.append(row)
+        matched_cols.append(col)
+    return np.asarray(matched_rows, dtype=np.int64), np.asarray(matched_cols, dtype=np.int64)
+
+def non_max_suppression(boxes, scores, classes, iou_threshold=0.5):
+    """Class-aware NMS over x1, y1, x2, y2 boxes. Returns the kept indices, best score first."""
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32)
+    classes = np.asarray(classes)
+    # Shift each class into its own coordinate range so boxes of different classes never overlap
+    offsets = classes.astype(np.float32)[:, None] * (boxes.max() + 1 if len(boxes) else 0)
+    shifted = boxes + offsets
+
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while len(order):
+        best = order[0]
+        keep.append(best)
+        if len(order) == 1:
+            break
+        ious = box_iou_matrix(shifted[best], shifted[order[1:]])[0]
+        order = order[1:][ious <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
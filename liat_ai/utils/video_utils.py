@@ -1,27 +1,146 @@
+import os
+import queue
+import threading
 import cv2
 
+def iter_video_frames(video_path, start=0, stop=None):
+    """
+    Yields the frames of a video one at a time instead of holding them all in memory.
+    `start`/`stop` restrict it to frames [start, stop).
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frame_num = start
+    try:
+        while stop is None or frame_num < stop:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+            frame_num += 1
+    finally:
+        cap.release()
+
 def read_video(video_path):
+    return list(iter_video_frames(video_path))
+
+def get_video_fps(video_path, default=25):
     cap = cv2.VideoCapture(video_path)
-    frames = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frames.append(frame)
+    fps = cap.get(cv2.CAP_PROP_FPS)
     cap.release()
-    return frames
+    return fps if fps and fps > 0 else default
 
-def save_video(output_video_frames, output_path, fps=25):
-    if not output_video_frames:
-        print("No frames to save.")
-        return
+def get_video_frame_count(video_path):
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return frame_count
+
+class AsyncVideoWriter:
+    """
+    Encodes frames on a background thread fed by a bounded queue, so encoding overlaps
+    with tracking and drawing; `write` blocks only when the queue is full.
+
+    With `segment_seconds`, output rolls over to a new file every N seconds of video
+    (`out_000.mp4`, `out_001.mp4`, ...). Each finished segment is appended to `segments`
+    and passed to `on_segment`, so consumers can start on it while the match is still running.
+    """
+    def __init__(self, output_path, fps=25, max_queue=64, segment_seconds=None, on_segment=None):
+        self.output_path = output_path
+        self.fps = fps
+        self.segment_frames = int(round(segment_seconds * fps)) if segment_seconds else None
+        self.on_segment = on_segment
+        self.segments = []
+        self.frame_count = 0
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="AsyncVideoWriter", daemon=True)
+        self._thread.start()
+
+    def _segment_path(self, index):
+        if self.segment_frames is None:
+            return self.output_path
+        root, ext = os.path.splitext(self.output_path)
+        return f"{root}_{index:03d}{ext}"
+
+    def _finish_segment(self, out, path):
+        out.release()
+        self.segments.append(path)
+        if self.on_segment is not None:
+            self.on_segment(path)
 
-    height, width, _ = output_video_frames[0].shape
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v') # Codec for .mp4
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    def _run(self):
+        out = None
+        path = None
+        frames_in_segment = 0
+        try:
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
 
-    for frame in output_video_frames:
-        out.write(frame)
+                if out is not None and self.segment_frames is not None and frames_in_segment >= self.segment_frames:
+                    self._finish_segment(out, path)
+                    out = None
 
-    out.release()
-    print(f"Video saved successfully to {output_path}")
\ No newline at end of file
+                if out is None:
+                    height, width, _ = frame.shape
+                    path = self._segment_path(len(self.segments))
+                    fourcc = cv2.VideoWriter_fourcc(*'mp4v') # Codec for .mp4
+                    out = cv2.VideoWriter(path, fourcc, self.fps, (width, height))
+                    frames_in_segment = 0
+
+                out.write(frame)
+                frames_in_segment += 1
+                self.frame_count += 1
+
+            if out is not None:
+                self._finish_segment(out, path)
+        except Exception as e:
+            self._error = e
+            if out is not None:
+                out.release()
+            # Keep draining so a producer blocked on a full queue is released
+            while self._queue.get() is not None:
+                pass
+
+    def write(self, frame):
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding failed: {self._error}") from self._error
+        self._queue.put(frame)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Video encoding failed: {self._error}") from self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def save_video_stream(frames, output_path, fps=25, segment_seconds=None, on_segment=None):
+    """
+    Writes frames to `output_path` as they arrive from any iterable (e.g. a generator).
+    Encoding runs on a background `AsyncVideoWriter` thread, so it overlaps with whatever
+    produces the frames. Returns the frame count.
+    """
+    with AsyncVideoWriter(output_path, fps, segment_seconds=segment_seconds, on_segment=on_segment) as writer:
+        for frame in frames:
+            writer.write(frame)
+
+    if writer.frame_count == 0:
+        print("No frames to save.")
+    elif writer.segment_frames is not None:
+        print(f"Video saved successfully to {len(writer.segments)} segments: {output_path}")
+    else:
+        print(f"Video saved successfully to {output_path}")
+    return writer.frame_count
+
+def save_video(output_video_frames, output_path, fps=25):
+    save_video_stream(output_video_frames, output_path, fps)